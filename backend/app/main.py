@@ -1,10 +1,21 @@
+import logging
+import os
+
 from dotenv import load_dotenv
 load_dotenv()  # Load .env file before anything else
 
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+)
+# httpx logs every request at INFO; crawl and provider logs already cover them
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
-from app.routes import campaigns, health
+from app.routes import campaigns, health, images, jobs, metrics
 
 app = FastAPI(
     title="Marketing Campaign Generator API",
@@ -21,11 +32,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compresses the larger JSON responses; cached campaign reads arrive already compressed and pass through
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=6)
+
 # Include routers
 app.include_router(health.router, tags=["Health"])
 app.include_router(campaigns.router, prefix="/api/campaigns", tags=["Campaigns"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
+app.include_router(images.router, prefix="/api/images", tags=["Images"])
+app.include_router(metrics.router, tags=["Health"])
 
 
 @app.get("/")
 async def root():
     return {"message": "Marketing Campaign Generator API", "docs": "/docs"}
+
+
+@app.on_event("startup")
+async def startup():
+    await jobs.job_service.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await jobs.job_service.stop()
+    campaigns.scraper_service.close()
+    await campaigns.ai_service.aclose()
+    campaigns.campaign_service.store.close()
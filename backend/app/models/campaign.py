@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from datetime import datetime
 from enum import Enum
 
@@ -40,6 +40,12 @@ class CampaignFromURL(BaseModel):
     campaign_type: CampaignType = CampaignType.SOCIAL_MEDIA
     platforms: List[Platform] = [Platform.FACEBOOK, Platform.INSTAGRAM, Platform.TWITTER]
     generate_images: bool = False
+    bypass_cache: bool = False
+
+
+class CampaignBatch(BaseModel):
+    """Request model for generating many campaigns at once"""
+    items: List[Union[CampaignFromURL, CampaignGenerate]]
 
 
 class WebsiteAnalysis(BaseModel):
@@ -51,6 +57,7 @@ class WebsiteAnalysis(BaseModel):
     key_features: List[str]
     images: List[dict]
     pages_crawled: int
+    pages_deduped: int = 0
 
 
 class CampaignContent(BaseModel):
@@ -83,3 +90,55 @@ class Campaign(BaseModel):
     website_images: Optional[List[dict]] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+
+
+class CampaignSummary(BaseModel):
+    """Campaign without its content bodies, for list views"""
+    id: str
+    name: str
+    campaign_type: CampaignType
+    product_name: str
+    target_audience: str
+    platforms: List[Platform]
+    website_url: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def from_campaign(cls, campaign: Campaign) -> "CampaignSummary":
+        return cls(
+            id=campaign.id,
+            name=campaign.name,
+            campaign_type=campaign.campaign_type,
+            product_name=campaign.product_name,
+            target_audience=campaign.target_audience,
+            platforms=list(dict.fromkeys(c.platform for c in campaign.content)),
+            website_url=campaign.website_url,
+            created_at=campaign.created_at,
+            updated_at=campaign.updated_at,
+        )
+
+
+class CampaignView(str, Enum):
+    FULL = "full"
+    SUMMARY = "summary"
+
+
+class CampaignPage(BaseModel):
+    """One page of campaigns, newest first"""
+    items: List[Union[Campaign, CampaignSummary]]
+    next_cursor: Optional[str] = None
+
+
+class CampaignSearchHit(BaseModel):
+    """One ranked search result"""
+    campaign: CampaignSummary
+    score: float
+
+
+class CampaignSearchResult(BaseModel):
+    """Full-text search results with platform and hashtag facet counts"""
+    hits: List[CampaignSearchHit]
+    total: int
+    facets: Dict[str, Dict[str, int]]
+    next_offset: Optional[int] = None
@@ -1,25 +1,38 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-import uuid
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from typing import Optional
 from datetime import datetime
+import asyncio
+import json
 
 from app.models.campaign import (
     Campaign,
     CampaignCreate,
     CampaignGenerate,
     CampaignFromURL,
-    CampaignContent,
-    WebsiteAnalysis,
+    CampaignBatch,
+    CampaignPage,
+    CampaignSearchResult,
+    CampaignView,
     Platform,
+    CampaignType,
+    WebsiteAnalysis,
 )
 from app.services.campaign_service import CampaignService
+from app.services.campaign_store import CampaignFilter
 from app.services.scraper_service import ScraperService
 from app.services.ai_service import AIService
+from app.services.generation_service import GenerationService
+from app.services.batch_service import BatchService
+from app.services.provider_gateway import ProviderThrottledError, retry_after_header
+from app.services.response_cache import CachedJSON
 
 router = APIRouter()
 campaign_service = CampaignService()
 scraper_service = ScraperService()
 ai_service = AIService()
+generation_service = GenerationService(scraper_service, ai_service, campaign_service)
+batch_service = BatchService(generation_service, campaign_service)
 
 
 @router.post("/generate", response_model=Campaign)
@@ -36,62 +49,66 @@ async def generate_campaign(request: CampaignGenerate):
 async def generate_campaign_from_url(request: CampaignFromURL):
     """Generate a marketing campaign by analyzing a website"""
     try:
-        # Step 1: Scrape the website
-        website_content = await scraper_service.scrape_website(request.website_url)
-
-        # Step 2: Generate campaign content using AI
-        platform_values = [p.value for p in request.platforms]
-        ai_result = await ai_service.generate_campaign_from_website(
-            website_content,
-            platform_values,
-            request.campaign_type.value
-        )
-
-        # Step 3: Build campaign content
-        content = []
-        for item in ai_result.get("content", []):
-            # Map platform string to enum
-            platform_str = item.get("platform", "facebook")
-            try:
-                platform = Platform(platform_str)
-            except ValueError:
-                platform = Platform.FACEBOOK
-
-            generated_image_url = None
-            if request.generate_images:
-                prompt = await ai_service.generate_image_prompt(item, website_content.brand_name)
-                generated_image_url = await ai_service.generate_image(prompt)
-
-            content.append(CampaignContent(
-                platform=platform,
-                headline=item.get("headline", ""),
-                body=item.get("body", ""),
-                hashtags=item.get("hashtags", []),
-                call_to_action=item.get("call_to_action", "Learn More"),
-                image_suggestions=item.get("image_suggestions", []),
-                generated_image_url=generated_image_url
-            ))
-
-        # Step 4: Create and save campaign
-        campaign = Campaign(
-            id=str(uuid.uuid4()),
-            name=ai_result.get("campaign_name", f"{website_content.brand_name} Campaign"),
-            campaign_type=request.campaign_type,
-            product_name=website_content.brand_name,
-            target_audience=ai_result.get("target_audience", "General audience"),
-            content=content,
-            website_url=request.website_url,
-            website_images=[img for img in website_content.images[:5]],
-            created_at=datetime.utcnow()
-        )
-
-        campaign_service._campaigns[campaign.id] = campaign
-        return campaign
-
+        return await generation_service.generate_from_url(request)
+    except ProviderThrottledError as e:
+        # The AI provider is rate limiting us; ask the client to come back later
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": retry_after_header(e)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/generate-from-url/stream")
+async def generate_campaign_from_url_stream(request: CampaignFromURL):
+    """Generate a campaign from a website, streaming progress as Server-Sent Events.
+
+    Emits page, website, content and image events as each stage completes,
+    then a campaign event with the saved campaign (or an error event).
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run():
+        try:
+            await generation_service.generate_from_url(
+                request, lambda event, data: queue.put_nowait((event, data))
+            )
+        except ProviderThrottledError as e:
+            queue.put_nowait(("error", {"detail": str(e), "retry_after": int(retry_after_header(e))}))
+        except Exception as e:
+            queue.put_nowait(("error", {"detail": str(e)}))
+        finally:
+            queue.put_nowait(None)
+
+    async def event_stream():
+        task = asyncio.create_task(run())
+        try:
+            while (message := await queue.get()) is not None:
+                event, data = message
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            # Stop generating if the client goes away
+            task.cancel()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/batch")
+async def generate_campaign_batch(request: CampaignBatch):
+    """Generate campaigns for many URLs and products, streaming results as NDJSON.
+
+    Each line is one item's result, in completion order, tagged with the
+    item's index in the request.
+    """
+    async def result_stream():
+        async for result in batch_service.run(request.items):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+
 @router.post("/analyze-website", response_model=WebsiteAnalysis)
 async def analyze_website(website_url: str):
     """Analyze a website and return extracted content"""
@@ -104,29 +121,92 @@ async def analyze_website(website_url: str):
             products_services=content.products_services,
             key_features=content.key_features,
             images=content.images,
-            pages_crawled=content.pages_crawled
+            pages_crawled=content.pages_crawled,
+            pages_deduped=content.pages_deduped,
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/", response_model=List[Campaign])
-async def list_campaigns():
-    """List all saved campaigns"""
-    return campaign_service.list_campaigns()
+def _cached_json_response(request: Request, cached: CachedJSON) -> Response:
+    """Serve a cached body, compressed if the client accepts it, or 304 if the client already has it"""
+    encoding = cached.variant(request.headers.get("accept-encoding", ""))
+    headers = {
+        "ETag": cached.etag_for(encoding),
+        "Cache-Control": "no-cache",  # clients may keep it but must revalidate
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and cached.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(cached.encoded(encoding), media_type="application/json", headers=headers)
+
+
+# The read and delete handlers below are plain functions: they query SQLite,
+# so FastAPI runs them in its threadpool instead of on the event loop.
+@router.get("/", response_model=CampaignPage)
+def list_campaigns(
+    request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    campaign_type: Optional[CampaignType] = None,
+    platform: Optional[Platform] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    view: CampaignView = CampaignView.FULL,
+):
+    """List saved campaigns, newest first, one page at a time.
+
+    Pass the returned ``next_cursor`` as ``cursor`` to fetch the next page.
+    ``view=summary`` leaves out content bodies and images. Responses
+    carry an ETag; send it back as If-None-Match to get a 304 when the
+    page is unchanged.
+    """
+    filters = CampaignFilter(
+        campaign_type=campaign_type.value if campaign_type else None,
+        platform=platform.value if platform else None,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    try:
+        cached = campaign_service.list_campaign_page_json(limit, cursor, filters, view)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _cached_json_response(request, cached)
+
+
+@router.get("/search", response_model=CampaignSearchResult)
+def search_campaigns(
+    q: str = Query(..., min_length=1),
+    platform: Optional[Platform] = None,
+    hashtag: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """Search campaigns by words in their name, product, headlines, bodies or hashtags.
+
+    Results are ranked by BM25 and include platform and hashtag facet
+    counts over all matches. Pass ``next_offset`` as ``offset`` for the
+    next page.
+    """
+    return campaign_service.search_campaigns(
+        q, platform.value if platform else None, hashtag, limit, offset
+    )
 
 
 @router.get("/{campaign_id}", response_model=Campaign)
-async def get_campaign(campaign_id: str):
-    """Get a specific campaign by ID"""
-    campaign = campaign_service.get_campaign(campaign_id)
-    if not campaign:
+def get_campaign(campaign_id: str, request: Request):
+    """Get a specific campaign by ID (supports If-None-Match)"""
+    cached = campaign_service.get_campaign_json(campaign_id)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Campaign not found")
-    return campaign
+    return _cached_json_response(request, cached)
 
 
 @router.delete("/{campaign_id}")
-async def delete_campaign(campaign_id: str):
+def delete_campaign(campaign_id: str):
     """Delete a campaign"""
     success = campaign_service.delete_campaign(campaign_id)
     if not success:
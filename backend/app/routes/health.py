@@ -1,8 +1,21 @@
 from fastapi import APIRouter
 
+from app.routes.campaigns import ai_service, campaign_service, scraper_service
+
 router = APIRouter()
 
 
 @router.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@router.get("/health/cache")
+async def cache_stats():
+    """Hit/miss counts for the scrape, LLM and campaign response caches"""
+    return {
+        "scrape": scraper_service.cache_stats(),
+        "llm": ai_service.llm_cache.stats.as_dict(),
+        "campaign": campaign_service.campaign_cache.stats.as_dict(),
+        "campaign_page": campaign_service.page_cache.stats.as_dict(),
+    }
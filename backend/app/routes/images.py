@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from app.routes.campaigns import scraper_service
+
+router = APIRouter()
+
+
+@router.get("/{key}")
+async def get_image(key: str):
+    """A website image thumbnail from the local content-addressed store"""
+    image_service = scraper_service.image_service
+    path = image_service.store.path(key) if image_service else None
+    if path is None or not path.is_file():
+        raise HTTPException(status_code=404, detail="Image not found")
+    # Keys are content hashes, so a key's bytes never change
+    return FileResponse(
+        path, media_type="image/webp", headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException
+
+from app.models.campaign import Campaign, CampaignFromURL
+from app.models.job import Job, JobStatus
+from app.routes.campaigns import campaign_service, generation_service
+from app.services.job_service import JobService, QueueFullError
+
+router = APIRouter()
+job_service = JobService(generation_service)
+
+
+@router.post("/", response_model=Job, status_code=202)
+async def submit_job(request: CampaignFromURL):
+    """Queue a campaign generation job and return its id immediately"""
+    try:
+        return await job_service.submit(request)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+
+
+# Plain functions: they query SQLite, so FastAPI runs them in its threadpool
+@router.get("/{job_id}", response_model=Job)
+def get_job(job_id: str):
+    """Get the status of a job"""
+    job = job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}/result", response_model=Campaign)
+def get_job_result(job_id: str):
+    """Get the campaign produced by a finished job"""
+    job = job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+
+    campaign = campaign_service.get_campaign(job.campaign_id)
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return campaign
+
+
+@router.delete("/{job_id}", response_model=Job)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    job = await job_service.cancel_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
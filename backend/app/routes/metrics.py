@@ -0,0 +1,74 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.routes.campaigns import ai_service, campaign_service, scraper_service
+from app.routes.jobs import job_service
+from app.services.metrics import REGISTRY, render_metrics
+
+router = APIRouter()
+
+CACHES = {
+    "website": scraper_service.website_cache,
+    "page": scraper_service.page_cache,
+    "llm": ai_service.llm_cache,
+    "campaign": campaign_service.campaign_cache,
+    "campaign_page": campaign_service.page_cache,
+}
+
+
+def _cache_events() -> dict:
+    samples = {}
+    for name, cache in CACHES.items():
+        for event in ("hits", "misses", "stale", "revalidated", "evictions"):
+            samples[(name, event)] = getattr(cache.stats, event)
+    return samples
+
+
+def _cache_hit_ratio() -> dict:
+    return {(name,): cache.stats.as_dict()["hit_rate"] for name, cache in CACHES.items()}
+
+
+def _provider_state(key: str):
+    def samples() -> dict:
+        return {(name,): gateway.state()[key] for name, gateway in ai_service.gateways.items()}
+    return samples
+
+
+def _provider_circuit_open() -> dict:
+    return {(name,): int(gateway.state()["circuit"] != "closed") for name, gateway in ai_service.gateways.items()}
+
+
+def _hedge_rate() -> dict:
+    hedger = ai_service.hedger
+    return {(): hedger.stats.as_dict()["hedge_rate"] if hedger else 0.0}
+
+
+def _jobs() -> dict:
+    stats = job_service.stats()
+    return {(state,): stats[state] for state in ("queued", "running")}
+
+
+REGISTRY.callback_counter(
+    "cache_events_total", "Cache hits, misses, stale reads, revalidations and evictions", ("cache", "event"),
+    _cache_events,
+)
+REGISTRY.callback_gauge("cache_hit_ratio", "Fresh hits over all lookups, per cache", ("cache",), _cache_hit_ratio)
+REGISTRY.callback_gauge(
+    "provider_concurrency_limit", "Adaptive concurrency limit per provider", ("provider",),
+    _provider_state("concurrency_limit"),
+)
+REGISTRY.callback_gauge(
+    "provider_in_flight", "Calls holding a provider concurrency slot", ("provider",), _provider_state("in_flight")
+)
+REGISTRY.callback_gauge(
+    "provider_circuit_open", "1 while a provider's circuit breaker is open or probing", ("provider",),
+    _provider_circuit_open,
+)
+REGISTRY.callback_gauge("ai_hedge_rate", "Fraction of uncached LLM calls that were hedged", (), _hedge_rate)
+REGISTRY.callback_gauge("jobs", "Background jobs by state", ("state",), _jobs)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Pipeline metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,53 +1,258 @@
 import os
 import json
-from typing import Optional
-from anthropic import Anthropic
-from openai import OpenAI
-
+import asyncio
+import hashlib
+import copy
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import anthropic
+import openai
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+
+from app.services import metrics
+from app.services.cache import TieredCache
+from app.services.context_builder import ContextBuilder
+from app.services.fake_provider import FakeAsyncAnthropic, FakeAsyncOpenAI
+from app.services.hedging import Hedger
+from app.services.json_stream import StreamingArrayParser
+from app.services.provider_gateway import (
+    ProviderGateway,
+    ProviderThrottledError,
+    ProviderUnavailableError,
+)
 from app.services.scraper_service import WebsiteContent
+from app.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+JSON_INSTRUCTIONS = {
+    "anthropic": "Return the response as JSON",
+    "openai": "Return ONLY valid JSON",
+}
+
+GENERATION_MODES = ("single", "per_platform")
+
+# Provider that takes over hedged calls from each primary
+HEDGE_PARTNERS = {"anthropic": "openai", "openai": "anthropic"}
+
+# Seconds per provider request
+PROVIDER_TIMEOUT = 120.0
+
+# How each platform shows images, added to its image prompt
+PLATFORM_IMAGE_STYLES = {
+    "facebook": "Facebook feed post image",
+    "instagram": "square Instagram post, bold and eye-catching",
+    "twitter": "wide banner-style image for a tweet",
+    "linkedin": "polished, professional image for a LinkedIn post",
+    "tiktok": "vertical, energetic TikTok cover",
+    "google_ads": "clean display ad image with space for a headline",
+    "email": "wide email header image",
+}
+
+# Receives (index, platform dict) for each content item as soon as it is complete
+ContentCallback = Callable[[int, dict], None]
+
+# A completion's text, input tokens and output tokens
+Completion = Tuple[str, int, int]
+
+
+def _pooled_http_client(sdk, max_connections: int):
+    """HTTP client for a provider SDK with a connection pool of ``max_connections``.
+
+    Built from the SDK's own client and limits classes, since SDK releases
+    differ in which httpx package they are built on.
+    """
+    limits = type(sdk.DEFAULT_CONNECTION_LIMITS)(
+        max_connections=max_connections, max_keepalive_connections=max_connections
+    )
+    return sdk.DefaultAsyncHttpxClient(limits=limits)
+
+
+def _fallback_reason(error: Optional[Exception]) -> str:
+    """Metric label for why template content was used"""
+    return "unavailable" if isinstance(error, ProviderUnavailableError) else "error"
 
 
 class AIService:
     """Service for AI-powered content generation"""
 
-    def __init__(self):
+    def __init__(self, anthropic_client=None, openai_client=None):
         self.anthropic_key = os.getenv("ANTHROPIC_API_KEY")
         self.openai_key = os.getenv("OPENAI_API_KEY")
 
-        print(f"[AI Service] OpenAI Key present: {bool(self.openai_key)}")
-        print(f"[AI Service] Anthropic Key present: {bool(self.anthropic_key)}")
+        logger.info(
+            "ai.keys openai=%s anthropic=%s", bool(self.openai_key), bool(self.anthropic_key)
+        )
+
+        # One pooled HTTP transport per provider SDK
+        max_connections = int(os.getenv("AI_MAX_CONNECTIONS", "100"))
+        self._http_clients = []
+
+        if os.getenv("AI_FAKE_PROVIDERS", "false").lower() == "true":
+            # Local stand-ins with simulated latency, for offline load testing
+            fake_latency = {
+                "latency": float(os.getenv("AI_FAKE_LATENCY_SECONDS", "1.0")),
+                "tail_latency": float(os.getenv("AI_FAKE_TAIL_LATENCY_SECONDS", "0")),
+                "tail_rate": float(os.getenv("AI_FAKE_TAIL_RATE", "0")),
+            }
+            anthropic_client = anthropic_client or FakeAsyncAnthropic(**fake_latency)
+            openai_client = openai_client or FakeAsyncOpenAI(**fake_latency)
+
+        if anthropic_client is None and self.anthropic_key:
+            self._http_clients.append(_pooled_http_client(anthropic, max_connections))
+            # Retries are handled by the provider gateway
+            anthropic_client = AsyncAnthropic(
+                api_key=self.anthropic_key, http_client=self._http_clients[-1], timeout=PROVIDER_TIMEOUT,
+                max_retries=0,
+            )
+        if openai_client is None and self.openai_key:
+            self._http_clients.append(_pooled_http_client(openai, max_connections))
+            openai_client = AsyncOpenAI(
+                api_key=self.openai_key, http_client=self._http_clients[-1], timeout=PROVIDER_TIMEOUT,
+                max_retries=0,
+            )
+        self.anthropic = anthropic_client
+        self.openai = openai_client
+
+        # Rate limits, retries, adaptive concurrency and circuit breaking per provider
+        self.gateways = {
+            "anthropic": ProviderGateway.from_env("anthropic", "ANTHROPIC"),
+            "openai": ProviderGateway.from_env("openai", "OPENAI"),
+            "images": ProviderGateway.from_env("images", "OPENAI_IMAGES"),
+        }
+
+        # Stream completions so content items can be used before the reply is finished
+        self.streaming = os.getenv("AI_STREAMING", "true").lower() == "true"
+
+        # Opt-in: race slow or failed LLM calls against the other provider
+        self.hedger: Optional[Hedger] = None
+        if os.getenv("AI_HEDGING", "false").lower() == "true":
+            self.hedger = Hedger(
+                percentile=float(os.getenv("AI_HEDGE_PERCENTILE", "95")),
+                budget_ratio=float(os.getenv("AI_HEDGE_BUDGET_RATIO", "0.1")),
+                initial_delay=float(os.getenv("AI_HEDGE_INITIAL_DELAY_SECONDS", "10")),
+                min_samples=int(os.getenv("AI_HEDGE_MIN_SAMPLES", "20")),
+            )
+
+        # Cap on concurrent image generations within one campaign
+        self.image_concurrency = int(os.getenv("IMAGE_MAX_CONCURRENCY", "5"))
+
+        # single: one call for the whole campaign; per_platform: one call per platform
+        self.generation_mode = os.getenv("AI_GENERATION_MODE", "single").lower()
+        if self.generation_mode not in GENERATION_MODES:
+            raise ValueError(f"Unknown generation mode {self.generation_mode!r}, expected one of {GENERATION_MODES}")
+        self.platform_retries = int(os.getenv("AI_PLATFORM_RETRIES", "1"))
+
+        # Token budget for the page excerpts included in prompts
+        self.context_builder = ContextBuilder(token_budget=int(os.getenv("AI_CONTEXT_TOKEN_BUDGET", "600")))
 
-        self.anthropic = Anthropic(api_key=self.anthropic_key) if self.anthropic_key else None
-        self.openai = OpenAI(api_key=self.openai_key) if self.openai_key else None
+        # Parsed LLM results keyed by a hash of provider, model, prompt and parameters
+        self.llm_cache = TieredCache(
+            "llm",
+            ttl=float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400")),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")),
+            path=os.getenv("LLM_CACHE_PATH") or None,
+        )
 
-        print(f"[AI Service] OpenAI client: {self.openai is not None}")
+        # In-flight generations by input, shared by concurrent identical requests
+        self._generations: SingleFlight[dict] = SingleFlight("generate")
+
+        logger.info("ai.clients openai=%s anthropic=%s", self.openai is not None, self.anthropic is not None)
+
+    async def aclose(self) -> None:
+        """Close the provider HTTP transports"""
+        for client in self._http_clients:
+            await client.aclose()
 
     async def generate_campaign_from_website(
         self,
         website_content: WebsiteContent,
         platforms: list,
-        campaign_type: str
+        campaign_type: str,
+        use_cache: bool = True,
+        on_content: Optional[ContentCallback] = None,
     ) -> dict:
-        """Generate marketing campaign content from website analysis"""
+        """Generate marketing campaign content from website analysis.
 
-        # Build context from website content
-        context = self._build_context(website_content)
+        Concurrent calls with the same context, platforms, campaign type and
+        cache setting share one generation; each caller gets its own copy.
+
+        ``on_content`` is called once per content index with that platform's
+        dict as soon as it is available, which for a streamed completion is
+        while the rest of the reply is still being written. If the
+        generation later fails over (another provider, or template content)
+        the returned result is authoritative and may differ from what was
+        streamed.
+        """
 
-        # Generate campaign using available AI
-        print(f"[AI Service] Generating campaign - Anthropic: {self.anthropic is not None}, OpenAI: {self.openai is not None}")
+        # Build context from website content
+        with metrics.STAGE_SECONDS.time("context"):
+            context = self._build_context(website_content)
+
+        key = hashlib.sha256(
+            json.dumps([context, platforms, campaign_type, self.generation_mode, use_cache]).encode("utf-8")
+        ).hexdigest()
+
+        async def generate(emit: Callable[[tuple], None]) -> dict:
+            emitted = set()
+
+            def on_item(index: int, item: dict) -> None:
+                if index not in emitted:
+                    emitted.add(index)
+                    emit((index, item))
+
+            result = await self._generate(website_content, context, platforms, campaign_type, use_cache, on_item)
+            # Whatever was not streamed (cache hits, template content) is published now
+            for index, item in enumerate(result.get("content", [])):
+                on_item(index, item)
+            return result
+
+        listener = None
+        if on_content is not None:
+            listener = lambda event: on_content(event[0], copy.deepcopy(event[1]))  # noqa: E731
+        result = await self._generations.do(key, generate, listener=listener)
+        return copy.deepcopy(result)
+
+    async def _generate(
+        self,
+        website_content: WebsiteContent,
+        context: str,
+        platforms: list,
+        campaign_type: str,
+        use_cache: bool,
+        on_item: ContentCallback,
+    ) -> dict:
+        """Generate a campaign with the first available provider, or from templates"""
         if self.anthropic:
-            print("[AI Service] Using Claude...")
-            return await self._generate_with_claude(context, platforms, campaign_type)
+            logger.info("ai.generate provider=anthropic mode=%s platforms=%d", self.generation_mode, len(platforms))
+            metrics.GENERATIONS.inc("anthropic")
+            return await self._generate_with_claude(context, platforms, campaign_type, use_cache, on_item)
         elif self.openai:
-            print("[AI Service] Using OpenAI...")
-            return await self._generate_with_openai(context, platforms, campaign_type)
+            logger.info("ai.generate provider=openai mode=%s platforms=%d", self.generation_mode, len(platforms))
+            metrics.GENERATIONS.inc("openai")
+            return await self._generate_with_openai(context, platforms, campaign_type, use_cache, on_item)
         else:
-            print("[AI Service] Using fallback templates...")
+            logger.info("ai.generate provider=none platforms=%d", len(platforms))
+            metrics.GENERATIONS.inc("none")
+            metrics.FALLBACKS.inc("campaign", "no_provider")
             # Fallback to template-based generation
             return self._generate_fallback(website_content, platforms, campaign_type)
 
     def _build_context(self, website_content: WebsiteContent) -> str:
-        """Build context string from website content"""
+        """Build context string from website content.
+
+        Besides the aggregated fields, the most representative sentences
+        of the crawled pages are included, within the context token budget.
+        """
+        passages = self.context_builder.select(website_content.paragraphs)
+        key_passages = "\n".join(f"- {sentence}" for sentence in passages) or "- (none)"
+        image_notes = "; ".join(
+            f"{image['alt']} ({image['width']}x{image['height']})" if image.get("width") else image["alt"]
+            for image in website_content.images[:5] if image.get("alt")
+        ) or "none"
         return f"""
 Website Analysis:
 - Brand Name: {website_content.brand_name}
@@ -58,11 +263,146 @@ Website Analysis:
 - Key Features: {', '.join(website_content.key_features)}
 - Pages Analyzed: {website_content.pages_crawled}
 - Available Images: {len(website_content.images)} images found
+- Image Descriptions: {image_notes}
+
+Key Passages From The Website:
+{key_passages}
 """
 
-    async def _generate_with_claude(self, context: str, platforms: list, campaign_type: str) -> dict:
+    def _llm_cache_key(self, provider: str, model: str, prompt: str, params: dict) -> str:
+        """Content address for a provider call"""
+        payload = json.dumps([provider, model, prompt, params], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _cached_result(self, cache_key: str, use_cache: bool) -> Optional[dict]:
+        """Return a fresh cached LLM result, if caching is enabled for this call"""
+        if not use_cache:
+            return None
+        cached = self.llm_cache.get(cache_key)
+        if cached is not None and self.llm_cache.is_fresh(cached):
+            return copy.deepcopy(cached.value)
+        return None
+
+    async def _generate_with_claude(
+        self, context: str, platforms: list, campaign_type: str, use_cache: bool = True,
+        on_item: Optional[ContentCallback] = None,
+    ) -> dict:
         """Generate campaign using Claude"""
-        prompt = f"""Based on the following website analysis, create a compelling {campaign_type} marketing campaign for these platforms: {', '.join(platforms)}.
+        return await self._generate_with_provider("anthropic", context, platforms, campaign_type, use_cache, on_item)
+
+    async def _generate_with_openai(
+        self, context: str, platforms: list, campaign_type: str, use_cache: bool = True,
+        on_item: Optional[ContentCallback] = None,
+    ) -> dict:
+        """Generate campaign using OpenAI"""
+        return await self._generate_with_provider("openai", context, platforms, campaign_type, use_cache, on_item)
+
+    async def _generate_with_provider(
+        self,
+        provider: str,
+        context: str,
+        platforms: list,
+        campaign_type: str,
+        use_cache: bool,
+        on_item: Optional[ContentCallback] = None,
+    ) -> dict:
+        """Generate a campaign with one provider, falling back to templates on failure.
+
+        A provider that is down or returns unusable output gets template
+        content. A provider that is only rate limiting us raises
+        ProviderThrottledError instead, so callers can retry later rather
+        than receive generic copy.
+        """
+        if self.generation_mode == "per_platform":
+            return await self._generate_per_platform(provider, context, platforms, campaign_type, use_cache, on_item)
+
+        def prompt_for(p: str) -> str:
+            return self._campaign_prompt(p, context, platforms, campaign_type)
+
+        try:
+            return await self._complete_json(
+                provider, prompt_for, 2000, use_cache, required_keys=("content",), on_item=on_item
+            )
+        except ProviderThrottledError:
+            raise
+        except Exception as e:
+            logger.warning("ai.fallback provider=%s scope=campaign error=%r", provider, e)
+            metrics.FALLBACKS.inc("campaign", _fallback_reason(e))
+            return self._generate_fallback_from_context(context, platforms, campaign_type)
+
+    async def _generate_per_platform(
+        self,
+        provider: str,
+        context: str,
+        platforms: list,
+        campaign_type: str,
+        use_cache: bool,
+        on_item: Optional[ContentCallback] = None,
+    ) -> dict:
+        """Generate the campaign overview and each platform's content as concurrent calls.
+
+        A platform whose call fails is retried, and only that platform falls
+        back to template content if it keeps failing. Each platform is
+        passed to ``on_item`` as soon as its call finishes.
+        """
+        async def overview() -> dict:
+            def prompt_for(p: str) -> str:
+                return self._overview_prompt(p, context, platforms, campaign_type)
+
+            try:
+                return await self._complete_json(
+                    provider, prompt_for, 300, use_cache, required_keys=("campaign_name", "target_audience")
+                )
+            except ProviderThrottledError:
+                raise
+            except Exception as e:
+                logger.warning("ai.fallback provider=%s scope=overview error=%r", provider, e)
+                metrics.FALLBACKS.inc("overview", _fallback_reason(e))
+                return self._generate_fallback_from_context(context, [], campaign_type)
+
+        async def platform_content(index: int, platform: str) -> dict:
+            item = await generate_platform(platform)
+            if on_item is not None:
+                on_item(index, item)
+            return item
+
+        async def generate_platform(platform: str) -> dict:
+            def prompt_for(p: str) -> str:
+                return self._platform_prompt(p, context, platform, campaign_type)
+
+            error: Exception = None
+            for attempt in range(1 + self.platform_retries):
+                try:
+                    item = await self._complete_json(
+                        provider, prompt_for, 800, use_cache, required_keys=("headline", "body")
+                    )
+                    item["platform"] = platform
+                    return item
+                except ProviderThrottledError:
+                    raise
+                except Exception as e:
+                    error = e
+                    logger.warning(
+                        "ai.platform_failed provider=%s platform=%s attempt=%d error=%r",
+                        provider, platform, attempt + 1, e,
+                    )
+                    if isinstance(e, ProviderUnavailableError):
+                        break  # the gateway has already retried
+            metrics.FALLBACKS.inc("platform", _fallback_reason(error))
+            return self._generate_fallback_from_context(context, [platform], campaign_type)["content"][0]
+
+        summary, *content = await asyncio.gather(
+            overview(), *(platform_content(index, p) for index, p in enumerate(platforms))
+        )
+        return {
+            "campaign_name": summary.get("campaign_name"),
+            "target_audience": summary.get("target_audience"),
+            "content": content,
+        }
+
+    def _campaign_prompt(self, provider: str, context: str, platforms: list, campaign_type: str) -> str:
+        """Prompt for the whole campaign in one call"""
+        return f"""Based on the following website analysis, create a compelling {campaign_type} marketing campaign for these platforms: {', '.join(platforms)}.
 
 {context}
 
@@ -73,7 +413,7 @@ For each platform, provide:
 4. A clear call-to-action
 5. Image suggestions based on the brand
 
-Return the response as JSON with this structure:
+{JSON_INSTRUCTIONS[provider]} with this structure:
 {{
     "campaign_name": "Campaign name",
     "target_audience": "Identified target audience",
@@ -90,71 +430,215 @@ Return the response as JSON with this structure:
 }}
 """
 
-        try:
-            response = self.anthropic.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=2000,
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            # Parse JSON from response
-            content = response.content[0].text
-
-            # Try to extract JSON from the response
-            json_match = content
-            if "```json" in content:
-                json_match = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                json_match = content.split("```")[1].split("```")[0]
+    def _overview_prompt(self, provider: str, context: str, platforms: list, campaign_type: str) -> str:
+        """Prompt for the campaign-level fields only"""
+        return f"""Based on the following website analysis, plan a compelling {campaign_type} marketing campaign for these platforms: {', '.join(platforms)}.
 
-            return json.loads(json_match.strip())
+{context}
 
-        except Exception as e:
-            print(f"Claude error: {e}")
-            return self._generate_fallback_from_context(context, platforms, campaign_type)
+{JSON_INSTRUCTIONS[provider]} with this structure:
+{{
+    "campaign_name": "Campaign name",
+    "target_audience": "Identified target audience"
+}}
+"""
 
-    async def _generate_with_openai(self, context: str, platforms: list, campaign_type: str) -> dict:
-        """Generate campaign using OpenAI"""
-        prompt = f"""Based on the following website analysis, create a compelling {campaign_type} marketing campaign for these platforms: {', '.join(platforms)}.
+    def _platform_prompt(self, provider: str, context: str, platform: str, campaign_type: str) -> str:
+        """Prompt for one platform's content"""
+        return f"""Based on the following website analysis, write {campaign_type} marketing content for this platform: {platform}.
 
 {context}
 
-For each platform, provide:
+Provide:
 1. A catchy headline (under 60 characters)
-2. Engaging body copy (platform-appropriate length)
+2. Engaging body copy (appropriate length for {platform})
 3. Relevant hashtags (for social media)
 4. A clear call-to-action
 5. Image suggestions based on the brand
 
-Return ONLY valid JSON with this structure:
+{JSON_INSTRUCTIONS[provider]} with this structure:
 {{
-    "campaign_name": "Campaign name",
-    "target_audience": "Identified target audience",
-    "content": [
-        {{
-            "platform": "platform_name",
-            "headline": "headline text",
-            "body": "body copy",
-            "hashtags": ["tag1", "tag2"],
-            "call_to_action": "CTA text",
-            "image_suggestions": ["suggestion1", "suggestion2"]
-        }}
-    ]
+    "platform": "{platform}",
+    "headline": "headline text",
+    "body": "body copy",
+    "hashtags": ["tag1", "tag2"],
+    "call_to_action": "CTA text",
+    "image_suggestions": ["suggestion1", "suggestion2"]
 }}
 """
 
+    def _model_params(self, provider: str, max_tokens: int) -> Tuple[str, dict]:
+        if provider == "anthropic":
+            return "claude-sonnet-4-20250514", {"max_tokens": max_tokens}
+        return "gpt-4o-mini", {"max_tokens": max_tokens, "response_format": {"type": "json_object"}}
+
+    async def _complete_json(
+        self,
+        provider: str,
+        prompt_for: Callable[[str], str],
+        max_tokens: int,
+        use_cache: bool = True,
+        required_keys: tuple = (),
+        on_item: Optional[ContentCallback] = None,
+    ) -> dict:
+        """Send a prompt to a provider and parse its JSON reply.
+
+        ``prompt_for(provider)`` builds the prompt, so a hedged call can
+        send the other provider its own wording. Results are served from
+        and stored in the LLM cache. Raises if the call fails or the reply
+        is not a JSON object with ``required_keys``.
+
+        With streaming enabled, ``on_item`` receives each element of the
+        reply's ``content`` array as soon as it has been fully received.
+        Retried and hedged calls restart their indexes at 0, so callers
+        should ignore indexes they have already seen.
+        """
+        prompt = prompt_for(provider)
+        model, params = self._model_params(provider, max_tokens)
+        cached = self._cached_result(self._llm_cache_key(provider, model, prompt, params), use_cache)
+        if cached is not None:
+            metrics.LLM_CALLS.inc(provider, "cached")
+            return cached
+
+        secondary = HEDGE_PARTNERS[provider]
+        if self.hedger is None or getattr(self, secondary) is None:
+            return await self._request_json(provider, prompt, max_tokens, required_keys, on_item)
+        return await self.hedger.run(
+            provider,
+            secondary,
+            lambda p: self._request_json(p, prompt_for(p), max_tokens, required_keys, on_item),
+            key=lambda p: (p, max_tokens),  # output budgets differ a lot in latency
+        )
+
+    async def _request_json(
+        self,
+        provider: str,
+        prompt: str,
+        max_tokens: int,
+        required_keys: tuple,
+        on_item: Optional[ContentCallback] = None,
+    ) -> dict:
+        """Call a provider (skipping the cache lookup), then parse, validate and cache its JSON reply"""
+        model, params = self._model_params(provider, max_tokens)
+        stream = self.streaming and on_item is not None
+
+        async def request() -> Completion:
+            on_text = self._content_items(on_item) if stream else None
+            with metrics.LLM_IN_FLIGHT.track(provider), metrics.STAGE_SECONDS.time("llm"):
+                if provider == "anthropic":
+                    if stream:
+                        return await self._stream_anthropic(model, prompt, params, on_text)
+                    response = await self.anthropic.messages.create(
+                        model=model,
+                        messages=[{"role": "user", "content": prompt}],
+                        **params
+                    )
+                    return response.content[0].text, response.usage.input_tokens, response.usage.output_tokens
+                if stream:
+                    return await self._stream_openai(model, prompt, params, on_text)
+                response = await self.openai.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    **params
+                )
+                return (
+                    response.choices[0].message.content,
+                    response.usage.prompt_tokens,
+                    response.usage.completion_tokens,
+                )
+
+        started = time.monotonic()
         try:
-            response = self.openai.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}
+            content, input_tokens, output_tokens = await self.gateways[provider].call(
+                request,
+                tokens=len(prompt) // 4 + max_tokens,
+                usage=lambda completion: completion[1] + completion[2],
             )
-
-            return json.loads(response.choices[0].message.content)
-
-        except Exception as e:
-            print(f"OpenAI error: {e}")
-            return self._generate_fallback_from_context(context, platforms, campaign_type)
+        except Exception:
+            metrics.LLM_CALLS.inc(provider, "error")
+            raise
+        if self.hedger is not None:
+            self.hedger.observe((provider, max_tokens), time.monotonic() - started)
+
+        metrics.LLM_CALLS.inc(provider, "ok")
+        metrics.LLM_TOKENS.inc(provider, "input", amount=input_tokens)
+        metrics.LLM_TOKENS.inc(provider, "output", amount=output_tokens)
+        logger.debug("ai.completion provider=%s input_tokens=%d output_tokens=%d", provider, input_tokens, output_tokens)
+
+        # Try to extract JSON from the response
+        json_match = content
+        if "```json" in content:
+            json_match = content.split("```json")[1].split("```")[0]
+        elif "```" in content:
+            json_match = content.split("```")[1].split("```")[0]
+
+        result = json.loads(json_match.strip())
+        if not isinstance(result, dict) or any(key not in result for key in required_keys):
+            raise ValueError(f"Reply is missing one of {required_keys}")
+
+        self.llm_cache.set(self._llm_cache_key(provider, model, prompt, params), copy.deepcopy(result))
+        return result
+
+    def _content_items(self, on_item: ContentCallback) -> Callable[[str], None]:
+        """Text callback for one streamed completion that passes complete ``content`` items to ``on_item``"""
+        parser = StreamingArrayParser("content")
+        started = time.perf_counter()
+        index = 0
+
+        def on_text(text: str) -> None:
+            nonlocal index
+            for item in parser.feed(text):
+                if index == 0:
+                    metrics.STAGE_SECONDS.observe("llm_first_item", value=time.perf_counter() - started)
+                on_item(index, item)
+                index += 1
+
+        return on_text
+
+    async def _stream_anthropic(
+        self, model: str, prompt: str, params: dict, on_text: Callable[[str], None]
+    ) -> Completion:
+        """Stream a Claude completion, passing each text delta to ``on_text``"""
+        parts: List[str] = []
+        input_tokens = output_tokens = 0
+        stream = await self.anthropic.messages.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+            **params
+        )
+        async with stream:
+            async for event in stream:
+                if event.type == "message_start":
+                    input_tokens = event.message.usage.input_tokens
+                elif event.type == "content_block_delta" and event.delta.type == "text_delta":
+                    parts.append(event.delta.text)
+                    on_text(event.delta.text)
+                elif event.type == "message_delta":
+                    output_tokens = event.usage.output_tokens
+        return "".join(parts), input_tokens, output_tokens
+
+    async def _stream_openai(
+        self, model: str, prompt: str, params: dict, on_text: Callable[[str], None]
+    ) -> Completion:
+        """Stream an OpenAI chat completion, passing each text delta to ``on_text``"""
+        parts: List[str] = []
+        input_tokens = output_tokens = 0
+        stream = await self.openai.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+            stream_options={"include_usage": True},
+            **params
+        )
+        async with stream:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    on_text(chunk.choices[0].delta.content)
+                if chunk.usage:
+                    input_tokens, output_tokens = chunk.usage.prompt_tokens, chunk.usage.completion_tokens
+        return "".join(parts), input_tokens, output_tokens
 
     def _generate_fallback(self, website_content: WebsiteContent, platforms: list, campaign_type: str) -> dict:
         """Generate campaign without AI (template-based)"""
@@ -220,23 +704,144 @@ Return ONLY valid JSON with this structure:
         }
 
     async def generate_image_prompt(self, campaign_content: dict, brand_name: str) -> str:
-        """Generate a DALL-E prompt for campaign imagery"""
-        return f"Professional marketing image for {brand_name}. Modern, clean design with vibrant colors. Suitable for social media advertising. High quality, photorealistic."
+        """Generate a DALL-E prompt for one platform's content item"""
+        platform = campaign_content.get("platform", "")
+        style = PLATFORM_IMAGE_STYLES.get(platform, "social media advertising image")
+        suggestions = campaign_content.get("image_suggestions") or []
+        subject = suggestions[0] if suggestions else campaign_content.get("headline", "")
+        prompt = f"Professional marketing image for {brand_name}, as a {style}."
+        if subject:
+            prompt += f" Subject: {subject}."
+        if campaign_content.get("headline"):
+            prompt += f" It accompanies the headline \"{campaign_content['headline']}\"."
+        return prompt + " Modern, clean design with vibrant colors. High quality, photorealistic. No text."
 
     async def generate_image(self, prompt: str) -> Optional[str]:
         """Generate an image using DALL-E"""
         if not self.openai:
             return None
 
+        async def request():
+            with metrics.IMAGES_IN_FLIGHT.track(), metrics.STAGE_SECONDS.time("image"):
+                return await self.openai.images.generate(
+                    model="dall-e-3",
+                    prompt=prompt,
+                    size="1024x1024",
+                    quality="standard",
+                    n=1
+                )
+
         try:
-            response = self.openai.images.generate(
-                model="dall-e-3",
-                prompt=prompt,
-                size="1024x1024",
-                quality="standard",
-                n=1
-            )
+            response = await self.gateways["images"].call(request)
+            metrics.IMAGE_CALLS.inc("ok")
             return response.data[0].url
         except Exception as e:
-            print(f"Image generation error: {e}")
+            logger.warning("ai.image_failed error=%r", e)
+            metrics.IMAGE_CALLS.inc("error")
             return None
+
+    def image_batch(
+        self, brand_name: str, on_image: Optional[Callable[[int, Optional[str]], None]] = None
+    ) -> "ImageBatch":
+        """Image generations for one campaign, startable item by item as content arrives"""
+        return ImageBatch(self, brand_name, self.image_concurrency, on_image)
+
+    async def generate_images_for_content(
+        self,
+        items: List[dict],
+        brand_name: str,
+        on_image: Optional[Callable[[int, Optional[str]], None]] = None,
+    ) -> List[Optional[str]]:
+        """Generate images for all content items concurrently.
+
+        Returns one image URL (or None) per item, in item order. Items whose
+        prompts are identical share a single generation. ``on_image`` is
+        called with the item index and URL as each image arrives.
+        """
+        return await self.image_batch(brand_name, on_image).results(items)
+
+
+class ImageBatch:
+    """Image generations for one campaign's content items.
+
+    Items can be started one at a time (e.g. as they stream in from the
+    LLM) with ``start``; ``results`` starts whatever is left and waits for
+    all of them. Items whose prompts are identical (same platform and
+    content) share a single generation, and at most ``concurrency`` generations run at once.
+
+    The final items passed to ``results`` can differ from the streamed
+    ones (a retry, a hedge won by the other provider, or fallback
+    content). An item whose prompt changed gets a new image and its
+    stale generation is cancelled.
+    """
+
+    def __init__(
+        self,
+        ai_service: AIService,
+        brand_name: str,
+        concurrency: int,
+        on_image: Optional[Callable[[int, Optional[str]], None]] = None,
+    ):
+        self.ai_service = ai_service
+        self.brand_name = brand_name
+        self.on_image = on_image
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._generations: Dict[str, asyncio.Task] = {}
+        self._items: Dict[int, asyncio.Task] = {}
+        self._started: Dict[int, dict] = {}  # the item each index was started with
+        self._prompts: Dict[int, str] = {}
+
+    def start(self, index: int, item: dict) -> None:
+        """Start the image for content item ``index`` unless it has been started already"""
+        if index not in self._items:
+            self._started[index] = item
+            self._items[index] = asyncio.create_task(self._image_for_item(index, item))
+
+    async def results(self, items: List[dict]) -> List[Optional[str]]:
+        """One image URL (or None) per item, in item order, restarting items that changed since ``start``"""
+        for index, item in enumerate(items):
+            started = self._started.get(index)
+            if started is not None and started != item and (
+                await self.ai_service.generate_image_prompt(started, self.brand_name)
+                != await self.ai_service.generate_image_prompt(item, self.brand_name)
+            ):
+                logger.info("ai.image_restarted index=%d platform=%s", index, item.get("platform"))
+                self._restart(index, item)
+            else:
+                self.start(index, item)
+        results = await asyncio.gather(*(self._items[index] for index in range(len(items))), return_exceptions=True)
+        image_urls = []
+        for item, result in zip(items, results):
+            if isinstance(result, BaseException):
+                logger.warning("ai.image_failed platform=%s error=%r", item.get("platform"), result)
+                result = None
+            image_urls.append(result)
+        return image_urls
+
+    def cancel(self) -> None:
+        """Cancel generations that are still running (e.g. when the campaign failed)"""
+        for task in [*self._items.values(), *self._generations.values()]:
+            task.cancel()
+
+    def _restart(self, index: int, item: dict) -> None:
+        """Replace the image of ``index`` with one for ``item``, dropping a generation nobody else shares"""
+        self._items.pop(index).cancel()
+        old_prompt = self._prompts.pop(index, None)
+        if old_prompt is not None and old_prompt not in self._prompts.values():
+            self._generations.pop(old_prompt).cancel()
+        self._started.pop(index)
+        self.start(index, item)
+
+    async def _generate_limited(self, prompt: str) -> Optional[str]:
+        async with self._semaphore:
+            return await self.ai_service.generate_image(prompt)
+
+    async def _image_for_item(self, index: int, item: dict) -> Optional[str]:
+        prompt = await self.ai_service.generate_image_prompt(item, self.brand_name)
+        self._prompts[index] = prompt
+        if prompt not in self._generations:
+            self._generations[prompt] = asyncio.create_task(self._generate_limited(prompt))
+        image_url = await asyncio.shield(self._generations[prompt])
+        if self.on_image:
+            self.on_image(index, image_url)
+        return image_url
@@ -0,0 +1,70 @@
+import asyncio
+import os
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+from app.models.campaign import CampaignFromURL, CampaignGenerate
+from app.services.campaign_service import CampaignService
+from app.services.crawl_frontier import normalize_url
+from app.services.generation_service import GenerationService
+from app.services.scraper_service import WebsiteContent
+
+
+class BatchService:
+    """Runs many campaign generations with shared clients and bounded concurrency"""
+
+    def __init__(
+        self,
+        generation_service: GenerationService,
+        campaign_service: CampaignService,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.generation_service = generation_service
+        self.campaign_service = campaign_service
+        self.max_concurrency = max_concurrency or int(os.getenv("BATCH_MAX_CONCURRENCY", "10"))
+
+    async def run(self, items: List[Union[CampaignFromURL, CampaignGenerate]]) -> AsyncIterator[dict]:
+        """Generate a campaign for every item, yielding per-item results as they finish.
+
+        Each result is ``{"index", "status", "campaign"}`` on success or
+        ``{"index", "status", "error"}`` on failure; one failed item never
+        stops the rest. Items with the same normalized URL share a single
+        crawl. All crawls share one HTTP connection pool and per-host
+        request limits, so crawls of one host stay within
+        ``SCRAPER_PER_HOST_LIMIT`` together. Provider calls are
+        capped by AIService's per-provider limits.
+        """
+        scraper_service = self.generation_service.scraper_service
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        crawls: Dict[str, asyncio.Task] = {}
+        host_limits = scraper_service.create_host_limits()
+
+        async with scraper_service.create_client(max_connections=self.max_concurrency * scraper_service.workers) as client:
+            def crawl(url: str) -> asyncio.Task:
+                key = normalize_url(url)
+                if key not in crawls:
+                    crawls[key] = asyncio.create_task(
+                        scraper_service.scrape_website(url, client=client, host_limits=host_limits)
+                    )
+                return crawls[key]
+
+            async def run_item(index: int, item: Union[CampaignFromURL, CampaignGenerate]) -> dict:
+                async with semaphore:
+                    try:
+                        if isinstance(item, CampaignFromURL):
+                            website_content: WebsiteContent = await crawl(item.website_url)
+                            campaign = await self.generation_service.generate_from_url(
+                                item, website_content=website_content
+                            )
+                        else:
+                            campaign = await self.campaign_service.generate_campaign(item)
+                        return {"index": index, "status": "succeeded", "campaign": campaign.model_dump(mode="json")}
+                    except Exception as e:
+                        return {"index": index, "status": "failed", "error": str(e)}
+
+            tasks = [asyncio.create_task(run_item(index, item)) for index, item in enumerate(items)]
+            try:
+                for next_result in asyncio.as_completed(tasks):
+                    yield await next_result
+            finally:
+                for task in [*tasks, *crawls.values()]:
+                    task.cancel()
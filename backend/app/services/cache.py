@@ -0,0 +1,159 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class CacheEntry:
+    """A cached JSON-serializable value plus its bookkeeping"""
+    value: dict
+    stored_at: float
+    meta: dict = field(default_factory=dict)
+
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for one cache"""
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+    revalidated: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses + self.stale
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class TieredCache:
+    """TTL cache with a size-bounded in-memory LRU and an optional SQLite tier.
+
+    Expired entries are not dropped on lookup: they are returned with
+    ``fresh=False`` so callers can revalidate them. The SQLite tier lets
+    several worker processes (and restarts) share one cache file.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float,
+        max_entries: int,
+        path: Optional[str] = None,
+        stale_ttl: float = 7 * 24 * 3600,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self.stats = CacheStats()
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " meta TEXT NOT NULL, stored_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for key (fresh or stale), or None on a miss"""
+        entry = self._get_memory(key)
+        if entry is None:
+            entry = self._get_disk(key)
+            if entry is not None:
+                self._set_memory(key, entry)
+
+        if entry is None:
+            self.stats.misses += 1
+        elif self.is_fresh(entry):
+            self.stats.hits += 1
+        else:
+            self.stats.stale += 1
+        return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.age() < self.ttl
+
+    def set(self, key: str, value: dict, meta: Optional[dict] = None) -> None:
+        """Store a value, replacing any existing entry"""
+        entry = CacheEntry(value=value, stored_at=time.time(), meta=meta or {})
+        self._set_memory(key, entry)
+        if self._db is not None:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value), json.dumps(entry.meta), entry.stored_at),
+                )
+                self._writes += 1
+                if self._writes % 100 == 0:
+                    self._prune_disk()
+
+    def touch(self, key: str, entry: CacheEntry) -> None:
+        """Mark a stale entry as fresh again after a successful revalidation"""
+        self.stats.revalidated += 1
+        self.set(key, entry.value, entry.meta)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                self._db.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+                )
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _get_memory(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            return entry
+
+    def _set_memory(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.stats.evictions += 1
+
+    def _get_disk(self, key: str) -> Optional[CacheEntry]:
+        if self._db is None:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, meta, stored_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(value=json.loads(row[0]), meta=json.loads(row[1]), stored_at=row[2])
+
+    def _prune_disk(self) -> None:
+        """Drop entries too old to be worth revalidating"""
+        self._db.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND stored_at < ?",
+            (self.namespace, time.time() - self.stale_ttl),
+        )
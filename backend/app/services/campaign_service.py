@@ -1,20 +1,35 @@
+import asyncio
+import base64
+import os
 import uuid
-from datetime import datetime
+from dataclasses import astuple
+from datetime import datetime, timezone
 from typing import List, Optional
 
 from app.models.campaign import (
     Campaign,
     CampaignGenerate,
     CampaignContent,
+    CampaignPage,
+    CampaignSearchResult,
+    CampaignView,
 )
+from app.services.campaign_store import CampaignFilter, CampaignKey, CampaignStore, create_campaign_store
+from app.services.response_cache import CachedJSON, ResponseCache
 
 
 class CampaignService:
     """Service for managing marketing campaigns"""
 
-    def __init__(self):
-        # In-memory storage (replace with database in production)
-        self._campaigns: dict[str, Campaign] = {}
+    def __init__(self, store: Optional[CampaignStore] = None):
+        self.store = store or create_campaign_store()
+
+        # Serialized read responses. Campaigns never change once saved, so
+        # single campaigns can be kept for long; pages go stale whenever a
+        # campaign is added, so their TTL only matters with several workers.
+        max_entries = int(os.getenv("CAMPAIGN_CACHE_MAX_ENTRIES", "1024"))
+        self.campaign_cache = ResponseCache(max_entries, float(os.getenv("CAMPAIGN_CACHE_TTL_SECONDS", "300")))
+        self.page_cache = ResponseCache(max_entries, float(os.getenv("CAMPAIGN_PAGE_CACHE_TTL_SECONDS", "2")))
 
     async def generate_campaign(self, request: CampaignGenerate) -> Campaign:
         """Generate a marketing campaign using AI"""
@@ -49,7 +64,7 @@ class CampaignService:
             created_at=datetime.utcnow()
         )
 
-        self._campaigns[campaign_id] = campaign
+        await asyncio.to_thread(self.save_campaign, campaign)
         return campaign
 
     def _generate_hashtags(self, product_name: str, platform) -> List[str]:
@@ -69,17 +84,120 @@ class CampaignService:
 
         return base_hashtags + platform_hashtags.get(platform.value, [])
 
+    def save_campaign(self, campaign: Campaign) -> None:
+        """Save a campaign, replacing any campaign with the same ID"""
+        self.store.save(campaign)
+        self._invalidate([campaign.id])
+
+    def save_campaigns(self, campaigns: List[Campaign]) -> None:
+        """Save several campaigns in one write"""
+        self.store.save_many(campaigns)
+        self._invalidate([campaign.id for campaign in campaigns])
+
     def list_campaigns(self) -> List[Campaign]:
         """List all campaigns"""
-        return list(self._campaigns.values())
+        return self.store.list()
+
+    def list_campaign_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        filters: Optional[CampaignFilter] = None,
+        view: CampaignView = CampaignView.FULL,
+    ) -> CampaignPage:
+        """One page of campaigns, newest first.
+
+        ``cursor`` is the ``next_cursor`` of the previous page. Raises
+        ValueError for a malformed cursor.
+        """
+        filters = filters or CampaignFilter()
+        filters.created_after = _utc_naive(filters.created_after)
+        filters.created_before = _utc_naive(filters.created_before)
+
+        before = _decode_cursor(cursor) if cursor else None
+        items = self.store.page(limit + 1, before, filters, summary=view == CampaignView.SUMMARY)
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = _encode_cursor((items[-1].created_at, items[-1].id))
+        return CampaignPage(items=items, next_cursor=next_cursor)
+
+    def list_campaign_page_json(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        filters: Optional[CampaignFilter] = None,
+        view: CampaignView = CampaignView.FULL,
+    ) -> CachedJSON:
+        """``list_campaign_page`` as cached, serialized JSON"""
+        filters = filters or CampaignFilter()
+        key = (limit, cursor, astuple(filters), view)
+        cached = self.page_cache.get(key)
+        if cached is None:
+            version = self.page_cache.version
+            cached = CachedJSON.from_model(self.list_campaign_page(limit, cursor, filters, view))
+            self.page_cache.set(key, cached, version)
+        return cached
+
+    def search_campaigns(
+        self,
+        query: str,
+        platform: Optional[str] = None,
+        hashtag: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> CampaignSearchResult:
+        """Full-text search over campaign names, products, headlines, bodies and hashtags"""
+        result = self.store.search(query, platform, hashtag, limit, offset)
+        if offset + len(result.hits) < result.total:
+            result.next_offset = offset + len(result.hits)
+        return result
 
     def get_campaign(self, campaign_id: str) -> Optional[Campaign]:
         """Get a campaign by ID"""
-        return self._campaigns.get(campaign_id)
+        return self.store.get(campaign_id)
+
+    def get_campaign_json(self, campaign_id: str) -> Optional[CachedJSON]:
+        """A campaign as cached, serialized JSON, or None if it does not exist"""
+        cached = self.campaign_cache.get(campaign_id)
+        if cached is None:
+            version = self.campaign_cache.version
+            campaign = self.store.get(campaign_id)
+            if campaign is None:
+                return None
+            cached = CachedJSON.from_model(campaign)
+            self.campaign_cache.set(campaign_id, cached, version)
+        return cached
 
     def delete_campaign(self, campaign_id: str) -> bool:
         """Delete a campaign"""
-        if campaign_id in self._campaigns:
-            del self._campaigns[campaign_id]
-            return True
-        return False
+        deleted = self.store.delete(campaign_id)
+        self._invalidate([campaign_id])
+        return deleted
+
+    def _invalidate(self, campaign_ids: List[str]) -> None:
+        """Drop cached responses that a write to these campaigns may have changed"""
+        for campaign_id in campaign_ids:
+            self.campaign_cache.delete(campaign_id)
+        self.page_cache.clear()
+
+
+def _encode_cursor(key: CampaignKey) -> str:
+    raw = f"{key[0].isoformat(timespec='microseconds')}|{key[1]}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> CampaignKey:
+    try:
+        created_at, campaign_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), campaign_id
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Campaign timestamps are naive UTC; bring filter bounds into the same form"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
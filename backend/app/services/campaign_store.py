@@ -0,0 +1,409 @@
+import bisect
+import os
+import queue
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from app.models.campaign import Campaign, CampaignSearchHit, CampaignSearchResult, CampaignSummary
+from app.services.search_index import (
+    SearchIndex,
+    campaign_facets,
+    campaign_fields,
+    normalize_hashtag,
+    tokenize,
+)
+
+# Keyset position in the (created_at, id) ordering
+CampaignKey = Tuple[datetime, str]
+
+
+@dataclass
+class CampaignFilter:
+    """Filters for paging through campaigns"""
+    campaign_type: Optional[str] = None
+    platform: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+    def matches(self, campaign: Campaign) -> bool:
+        if self.campaign_type and campaign.campaign_type.value != self.campaign_type:
+            return False
+        if self.platform and all(c.platform.value != self.platform for c in campaign.content):
+            return False
+        if self.created_after and campaign.created_at < self.created_after:
+            return False
+        if self.created_before and campaign.created_at >= self.created_before:
+            return False
+        return True
+
+
+class CampaignStore:
+    """Storage backend interface for campaigns"""
+
+    def save(self, campaign: Campaign) -> None:
+        self.save_many([campaign])
+
+    def save_many(self, campaigns: List[Campaign]) -> None:
+        raise NotImplementedError
+
+    def get(self, campaign_id: str) -> Optional[Campaign]:
+        raise NotImplementedError
+
+    def delete(self, campaign_id: str) -> bool:
+        raise NotImplementedError
+
+    def list(self) -> List[Campaign]:
+        """All campaigns, oldest first"""
+        raise NotImplementedError
+
+    def page(
+        self,
+        limit: int,
+        before: Optional[CampaignKey] = None,
+        filters: Optional[CampaignFilter] = None,
+        summary: bool = False,
+    ) -> List[Union[Campaign, CampaignSummary]]:
+        """Up to ``limit`` campaigns ordered newest first, starting after the ``before`` key"""
+        raise NotImplementedError
+
+    def search(
+        self,
+        query: str,
+        platform: Optional[str] = None,
+        hashtag: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> CampaignSearchResult:
+        """Campaigns matching every query term, best BM25 score first, with facet counts"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryCampaignStore(CampaignStore):
+    """In-process dict store (not shared between workers, lost on restart)"""
+
+    def __init__(self):
+        self._campaigns: Dict[str, Campaign] = {}
+        self._order: List[CampaignKey] = []  # sorted (created_at, id) index
+        self._search_index = SearchIndex()
+
+    def save_many(self, campaigns: List[Campaign]) -> None:
+        for campaign in campaigns:
+            self.delete(campaign.id)
+            self._campaigns[campaign.id] = campaign
+            bisect.insort(self._order, (campaign.created_at, campaign.id))
+            self._search_index.add(campaign.id, campaign_fields(campaign), campaign_facets(campaign))
+
+    def get(self, campaign_id: str) -> Optional[Campaign]:
+        return self._campaigns.get(campaign_id)
+
+    def delete(self, campaign_id: str) -> bool:
+        campaign = self._campaigns.pop(campaign_id, None)
+        if campaign is None:
+            return False
+        index = bisect.bisect_left(self._order, (campaign.created_at, campaign.id))
+        del self._order[index]
+        self._search_index.remove(campaign_id)
+        return True
+
+    def list(self) -> List[Campaign]:
+        return [self._campaigns[campaign_id] for _, campaign_id in self._order]
+
+    def page(
+        self,
+        limit: int,
+        before: Optional[CampaignKey] = None,
+        filters: Optional[CampaignFilter] = None,
+        summary: bool = False,
+    ) -> List[Union[Campaign, CampaignSummary]]:
+        filters = filters or CampaignFilter()
+        end = bisect.bisect_left(self._order, before) if before else len(self._order)
+        if filters.created_before:
+            end = min(end, bisect.bisect_left(self._order, (filters.created_before, "")))
+
+        items = []
+        for index in range(end - 1, -1, -1):
+            created_at, campaign_id = self._order[index]
+            if filters.created_after and created_at < filters.created_after:
+                break
+            campaign = self._campaigns[campaign_id]
+            if filters.matches(campaign):
+                items.append(CampaignSummary.from_campaign(campaign) if summary else campaign)
+                if len(items) >= limit:
+                    break
+        return items
+
+    def search(
+        self,
+        query: str,
+        platform: Optional[str] = None,
+        hashtag: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> CampaignSearchResult:
+        filters = {}
+        if platform:
+            filters["platform"] = platform
+        if hashtag:
+            filters["hashtag"] = normalize_hashtag(hashtag)
+        result = self._search_index.search(query, filters, limit, offset)
+        return CampaignSearchResult(
+            hits=[
+                CampaignSearchHit(campaign=CampaignSummary.from_campaign(self._campaigns[doc_id]), score=score)
+                for doc_id, score in result.hits
+            ],
+            total=result.total,
+            facets=result.facets,
+        )
+
+
+class SQLiteCampaignStore(CampaignStore):
+    """SQLite store in WAL mode, shared by every worker that opens the same file.
+
+    Campaigns are stored as JSON alongside indexed columns for the fields
+    we filter and sort on. Connections come from a small pool so readers
+    in different threads do not serialize on one connection.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4):
+        self.path = path
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+
+        with self._connection() as db:
+            db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS campaigns (
+                    id TEXT PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    campaign_type TEXT NOT NULL,
+                    product_name TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    summary TEXT
+                );
+                CREATE TABLE IF NOT EXISTS campaign_platforms (
+                    campaign_id TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    PRIMARY KEY (campaign_id, platform)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS campaign_hashtags (
+                    campaign_id TEXT NOT NULL,
+                    hashtag TEXT NOT NULL,
+                    PRIMARY KEY (campaign_id, hashtag)
+                ) WITHOUT ROWID;
+                CREATE VIRTUAL TABLE IF NOT EXISTS campaign_search USING fts5(
+                    product_name, name, headlines, bodies, hashtags
+                );
+                CREATE INDEX IF NOT EXISTS idx_campaigns_created_at ON campaigns (created_at, id);
+                CREATE INDEX IF NOT EXISTS idx_campaigns_type_created_at ON campaigns (campaign_type, created_at, id);
+                CREATE INDEX IF NOT EXISTS idx_campaigns_product ON campaigns (product_name);
+                CREATE INDEX IF NOT EXISTS idx_campaign_platforms_platform ON campaign_platforms (platform);
+                CREATE INDEX IF NOT EXISTS idx_campaign_hashtags_hashtag ON campaign_hashtags (hashtag);
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("PRAGMA busy_timeout=5000")
+        return db
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        db = self._pool.get()
+        try:
+            yield db
+        finally:
+            self._pool.put(db)
+
+    def save_many(self, campaigns: List[Campaign]) -> None:
+        """Write campaigns in a single transaction"""
+        with self._connection() as db:
+            self._write(db, campaigns)
+
+    def _write(self, db: sqlite3.Connection, campaigns: List[Campaign]) -> None:
+        facet_rows = {"platform": [], "hashtag": []}
+        for c in campaigns:
+            for name, values in campaign_facets(c).items():
+                facet_rows[name].extend((c.id, value) for value in values)
+        ids = [(c.id,) for c in campaigns]
+
+        db.execute("BEGIN")
+        try:
+            for c in campaigns:
+                # The search row shares the campaign's rowid, which REPLACE reassigns
+                self._delete_search_row(db, c.id)
+                cursor = db.execute(
+                    "INSERT OR REPLACE INTO campaigns (id, created_at, campaign_type, product_name, data, summary)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        c.id,
+                        _timestamp(c.created_at),
+                        c.campaign_type.value,
+                        c.product_name,
+                        c.model_dump_json(),
+                        CampaignSummary.from_campaign(c).model_dump_json(),
+                    ),
+                )
+                fields = campaign_fields(c)
+                db.execute(
+                    "INSERT INTO campaign_search (rowid, product_name, name, headlines, bodies, hashtags)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (cursor.lastrowid, fields["product_name"], fields["name"], fields["headlines"],
+                     fields["bodies"], fields["hashtags"]),
+                )
+            db.executemany("DELETE FROM campaign_platforms WHERE campaign_id = ?", ids)
+            db.executemany("DELETE FROM campaign_hashtags WHERE campaign_id = ?", ids)
+            db.executemany("INSERT INTO campaign_platforms VALUES (?, ?)", facet_rows["platform"])
+            db.executemany("INSERT INTO campaign_hashtags VALUES (?, ?)", facet_rows["hashtag"])
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def get(self, campaign_id: str) -> Optional[Campaign]:
+        with self._connection() as db:
+            row = db.execute("SELECT data FROM campaigns WHERE id = ?", (campaign_id,)).fetchone()
+        return Campaign.model_validate_json(row[0]) if row else None
+
+    def _delete_search_row(self, db: sqlite3.Connection, campaign_id: str) -> None:
+        row = db.execute("SELECT rowid FROM campaigns WHERE id = ?", (campaign_id,)).fetchone()
+        if row:
+            db.execute("DELETE FROM campaign_search WHERE rowid = ?", row)
+
+    def delete(self, campaign_id: str) -> bool:
+        with self._connection() as db:
+            db.execute("BEGIN")
+            try:
+                self._delete_search_row(db, campaign_id)
+                cursor = db.execute("DELETE FROM campaigns WHERE id = ?", (campaign_id,))
+                db.execute("DELETE FROM campaign_platforms WHERE campaign_id = ?", (campaign_id,))
+                db.execute("DELETE FROM campaign_hashtags WHERE campaign_id = ?", (campaign_id,))
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return cursor.rowcount > 0
+
+    def list(self) -> List[Campaign]:
+        with self._connection() as db:
+            rows = db.execute("SELECT data FROM campaigns ORDER BY created_at, id").fetchall()
+        return [Campaign.model_validate_json(row[0]) for row in rows]
+
+    def page(
+        self,
+        limit: int,
+        before: Optional[CampaignKey] = None,
+        filters: Optional[CampaignFilter] = None,
+        summary: bool = False,
+    ) -> List[Union[Campaign, CampaignSummary]]:
+        filters = filters or CampaignFilter()
+        clauses, params = [], []
+        if before:
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend([_timestamp(before[0]), before[1]])
+        if filters.campaign_type:
+            clauses.append("campaign_type = ?")
+            params.append(filters.campaign_type)
+        if filters.created_after:
+            clauses.append("created_at >= ?")
+            params.append(_timestamp(filters.created_after))
+        if filters.created_before:
+            clauses.append("created_at < ?")
+            params.append(_timestamp(filters.created_before))
+        if filters.platform:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM campaign_platforms p WHERE p.campaign_id = campaigns.id AND p.platform = ?)"
+            )
+            params.append(filters.platform)
+
+        column = "summary" if summary else "data"
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connection() as db:
+            rows = db.execute(
+                f"SELECT {column} FROM campaigns {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+
+        model = CampaignSummary if summary else Campaign
+        return [model.model_validate_json(row[0]) for row in rows]
+
+    def search(
+        self,
+        query: str,
+        platform: Optional[str] = None,
+        hashtag: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> CampaignSearchResult:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return CampaignSearchResult(hits=[], total=0, facets={"platform": {}, "hashtag": {}})
+
+        # Quote every term so user input is never parsed as FTS5 query syntax
+        match = " ".join(f'"{term}"' for term in terms)
+        clauses, params = ["campaign_search MATCH ?"], [match]
+        if platform:
+            clauses.append("c.id IN (SELECT campaign_id FROM campaign_platforms WHERE platform = ?)")
+            params.append(platform)
+        if hashtag:
+            clauses.append("c.id IN (SELECT campaign_id FROM campaign_hashtags WHERE hashtag = ?)")
+            params.append(normalize_hashtag(hashtag))
+        matches = (
+            "FROM campaign_search JOIN campaigns c ON c.rowid = campaign_search.rowid "
+            f"WHERE {' AND '.join(clauses)}"
+        )
+
+        with self._connection() as db:
+            rows = db.execute(
+                f"SELECT c.summary, bm25(campaign_search, 2.0, 2.0, 3.0, 1.0, 2.0) AS rank {matches}"
+                " ORDER BY rank LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+            total = db.execute(f"SELECT COUNT(*) {matches}", params).fetchone()[0]
+            facets = {}
+            for name, table in (("platform", "campaign_platforms"), ("hashtag", "campaign_hashtags")):
+                facet_rows = db.execute(
+                    f"SELECT {name}, COUNT(*) AS n FROM {table} WHERE campaign_id IN (SELECT c.id {matches})"
+                    f" GROUP BY {name} ORDER BY n DESC LIMIT 20",
+                    params,
+                ).fetchall()
+                facets[name] = dict(facet_rows)
+
+        return CampaignSearchResult(
+            hits=[
+                CampaignSearchHit(campaign=CampaignSummary.model_validate_json(row[0]), score=-row[1])
+                for row in rows
+            ],
+            total=total,
+            facets=facets,
+        )
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+def _timestamp(value: datetime) -> str:
+    """Fixed-width ISO timestamp, so string order matches time order"""
+    return value.isoformat(timespec="microseconds")
+
+
+def create_campaign_store() -> CampaignStore:
+    """Build the store selected by CAMPAIGN_STORE (sqlite or memory)"""
+    backend = os.getenv("CAMPAIGN_STORE", "sqlite").lower()
+    if backend == "memory":
+        return MemoryCampaignStore()
+    if backend == "sqlite":
+        return SQLiteCampaignStore(
+            os.getenv("CAMPAIGN_DB_PATH", "campaigns.db"),
+            pool_size=int(os.getenv("CAMPAIGN_DB_POOL_SIZE", "4")),
+        )
+    raise ValueError(f"Unknown campaign store {backend!r}, expected 'sqlite' or 'memory'")
@@ -0,0 +1,92 @@
+import re
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'])")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Words too common to say anything about a sentence
+STOP_WORDS = frozenset("""
+a about all also an and any are as at be been but by can do does for from get has have how i if in
+into is it its just more most no not of on one or our out so than that the their them then there
+these they this to up us was we what when which who will with you your
+""".split())
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)"""
+    return max(1, len(text) // 4)
+
+
+def split_sentences(texts: Iterable[str], min_chars: int = 30, max_chars: int = 400) -> List[str]:
+    """Sentences of a set of paragraphs, dropping fragments and run-ons"""
+    sentences = []
+    for text in texts:
+        for sentence in _SENTENCE_RE.split(" ".join(text.split())):
+            if min_chars <= len(sentence) <= max_chars:
+                sentences.append(sentence)
+    return list(dict.fromkeys(sentences))
+
+
+def _tfidf_matrix(sentences: List[str]) -> np.ndarray:
+    """L2-normalized TF-IDF rows, one per sentence"""
+    vocabulary: Dict[str, int] = {}
+    rows, cols = [], []
+    for row, sentence in enumerate(sentences):
+        for token in _TOKEN_RE.findall(sentence.lower()):
+            if token in STOP_WORDS or len(token) < 2:
+                continue
+            rows.append(row)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+
+    matrix = np.zeros((len(sentences), max(len(vocabulary), 1)), dtype=np.float32)
+    np.add.at(matrix, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), 1.0)
+
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1.0
+    matrix = np.log1p(matrix) * idf.astype(np.float32)
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-9)
+
+
+class ContextBuilder:
+    """Picks the most representative sentences of a site within a token budget.
+
+    Sentences are scored by TF-IDF cosine similarity to the centroid of
+    all sentences (how central they are to what the site talks about),
+    with a small bonus for appearing early. They are then taken best
+    first, skipping any that repeat an already chosen sentence, until the
+    token budget is spent, and returned in their original order.
+    """
+
+    def __init__(self, token_budget: int = 600, redundancy_threshold: float = 0.7):
+        self.token_budget = token_budget
+        self.redundancy_threshold = redundancy_threshold
+
+    def select(self, paragraphs: Iterable[str]) -> List[str]:
+        sentences = split_sentences(paragraphs)
+        if not sentences or self.token_budget <= 0:
+            return []
+
+        matrix = _tfidf_matrix(sentences)
+        centroid = matrix.mean(axis=0)
+        centroid /= max(float(np.linalg.norm(centroid)), 1e-9)
+        position_bonus = 0.1 / (1.0 + np.arange(len(sentences), dtype=np.float32) / 10.0)
+        scores = matrix @ centroid + position_bonus
+
+        chosen: List[int] = []
+        remaining = self.token_budget
+        for index in np.argsort(-scores, kind="stable"):
+            cost = estimate_tokens(sentences[index])
+            if cost > remaining:
+                continue
+            if chosen and float(np.max(matrix[chosen] @ matrix[index])) >= self.redundancy_threshold:
+                continue
+            chosen.append(int(index))
+            remaining -= cost
+            if remaining < 10:
+                break
+
+        return [sentences[index] for index in sorted(chosen)]
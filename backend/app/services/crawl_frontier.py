@@ -0,0 +1,113 @@
+import heapq
+import re
+from typing import List, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "ref", "ref_src", "igshid", "spm",
+}
+
+# Path/anchor keywords that usually mark pages describing the offering
+PRODUCT_KEYWORDS = {
+    "product": 3.0, "products": 3.0, "feature": 3.0, "features": 3.0, "solution": 2.5, "solutions": 2.5,
+    "service": 2.5, "services": 2.5, "pricing": 2.0, "plans": 1.5, "shop": 2.0, "collections": 2.0,
+    "platform": 2.0, "how": 1.5, "benefits": 2.0, "why": 1.5, "about": 1.5, "customers": 1.0,
+    "use": 1.0, "cases": 1.0, "industries": 1.0, "overview": 1.5, "tour": 1.5,
+}
+
+# Keywords of pages that rarely carry marketing content
+LOW_VALUE_KEYWORDS = {
+    "login", "signin", "sign", "logout", "register", "signup", "account", "cart", "checkout", "basket",
+    "privacy", "terms", "legal", "cookie", "cookies", "gdpr", "careers", "jobs", "press", "tag", "tags",
+    "author", "wp", "admin", "search", "feed", "rss", "sitemap", "status", "support", "help", "docs",
+}
+
+_WORD_RE = re.compile(r"[a-z]+")
+_PAGINATION_RE = re.compile(r"/page/\d+|[?&]page=\d+")
+_LOC_RE = re.compile(rb"<loc>\s*([^<\s]+)\s*</loc>", re.IGNORECASE)
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for cache keys and de-duplication.
+
+    Lowercases scheme and host, drops default ports, fragments, trailing
+    slashes and tracking parameters, and sorts the remaining query.
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    path = parsed.path.rstrip("/") or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    ))
+    return urlunparse((scheme, netloc, path, "", query, ""))
+
+
+def score_link(url: str, anchor_text: str = "", depth: int = 1) -> float:
+    """How likely a link is to describe products and features (higher is better)"""
+    parsed = urlparse(url)
+    words = _WORD_RE.findall(parsed.path.lower()) + _WORD_RE.findall(anchor_text.lower())
+
+    score = 0.0
+    for word in words:
+        score += PRODUCT_KEYWORDS.get(word, 0.0)
+        if word in LOW_VALUE_KEYWORDS:
+            score -= 4.0
+    if _PAGINATION_RE.search(url.lower()):
+        score -= 2.0
+    if parsed.query:
+        score -= 1.0
+
+    # Prefer pages close to the home page
+    return score - 0.5 * depth
+
+
+def url_depth(url: str) -> int:
+    """Number of path segments in a URL"""
+    return len([segment for segment in urlparse(url).path.split("/") if segment])
+
+
+def parse_sitemap(body: bytes) -> Tuple[List[str], bool]:
+    """URLs listed in a sitemap, and whether it is a sitemap index"""
+    urls = [match.decode("utf-8", "ignore") for match in _LOC_RE.findall(body)]
+    return urls, b"<sitemapindex" in body[:2048].lower()
+
+
+class CrawlFrontier:
+    """Priority queue of URLs to crawl, de-duplicated by normalized URL.
+
+    Pops the highest-scoring URL first; ties go to the URL discovered
+    first. The crawler pushes links in a fixed order (see
+    ScraperService._crawl_pages), so the pop order is stable too.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._seen: Set[str] = set()
+        self._next_order = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def seen(self, url: str) -> bool:
+        return normalize_url(url) in self._seen
+
+    def push(self, url: str, score: float, depth: int) -> bool:
+        """Add a URL unless an equivalent one was already queued"""
+        key = normalize_url(url)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        heapq.heappush(self._heap, (-score, self._next_order, url, depth))
+        self._next_order += 1
+        return True
+
+    def pop(self) -> Tuple[int, str, int]:
+        """Best URL as (discovery order, url, depth)"""
+        _, order, url, depth = heapq.heappop(self._heap)
+        return order, url, depth
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import random
+import re
+import uuid
+from types import SimpleNamespace
+from typing import AsyncIterator, List
+
+
+class FakeProviderStats:
+    """Call counters shared by the fake provider endpoints"""
+
+    def __init__(self):
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def __enter__(self):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return self
+
+    def __exit__(self, *exc):
+        self.in_flight -= 1
+        return False
+
+
+def fake_latency(latency: float, tail_latency: float = 0.0, tail_rate: float = 0.0) -> float:
+    """``latency``, or ``tail_latency`` for a random ``tail_rate`` fraction of calls"""
+    if tail_rate and random.random() < tail_rate:
+        return tail_latency
+    return latency
+
+
+def _platforms_from_prompt(prompt: str) -> List[str]:
+    """Pull the requested platform list out of a campaign prompt"""
+    match = re.search(r"for these platforms: ([^.\n]+)", prompt)
+    if not match:
+        return ["facebook"]
+    return [p.strip() for p in match.group(1).split(",") if p.strip()]
+
+
+def _brand_from_prompt(prompt: str) -> str:
+    match = re.search(r"Brand Name: (.*)", prompt)
+    return match.group(1).strip() if match and match.group(1).strip() else "Acme"
+
+
+def _fake_platform_content(brand: str, platform: str) -> dict:
+    return {
+        "platform": platform,
+        "headline": f"Meet {brand} on {platform.title()}",
+        "body": f"{brand} helps you do more with less. Find out how on {platform}.",
+        "hashtags": [f"#{brand.replace(' ', '')}", "#Launch"],
+        "call_to_action": "Learn More",
+        "image_suggestions": [f"{brand} hero shot", "Product in use"],
+    }
+
+
+def fake_campaign_json(prompt: str) -> str:
+    """Build a well-formed JSON reply for a campaign, overview or single-platform prompt"""
+    brand = _brand_from_prompt(prompt)
+    single = re.search(r"for this platform: (\w+)", prompt)
+    if single:
+        return json.dumps(_fake_platform_content(brand, single.group(1)))
+
+    result = {
+        "campaign_name": f"{brand} Launch Campaign",
+        "target_audience": f"People who would love {brand}",
+    }
+    if '"content"' in prompt:
+        result["content"] = [_fake_platform_content(brand, p) for p in _platforms_from_prompt(prompt)]
+    return json.dumps(result)
+
+
+def fake_chunks(text: str, size: int = 40) -> List[str]:
+    """Split a reply into the pieces a streaming provider would send"""
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+class _FakeStream:
+    """Async iterator (and context manager) yielding events spread evenly over ``latency``"""
+
+    def __init__(self, events: list, latency: float, stats: FakeProviderStats):
+        self._events = events
+        self._latency = latency
+        self._stats = stats
+
+    async def __aenter__(self) -> "_FakeStream":
+        return self
+
+    async def __aexit__(self, *exc) -> bool:
+        return False
+
+    def __aiter__(self) -> AsyncIterator:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator:
+        delay = self._latency / len(self._events)
+        with self._stats:
+            for event in self._events:
+                await asyncio.sleep(delay)
+                yield event
+
+
+class _FakeMessages:
+    def __init__(self, owner: "FakeAsyncAnthropic"):
+        self._owner = owner
+
+    async def create(self, model: str, max_tokens: int, messages: list, stream: bool = False, **kwargs):
+        prompt = messages[-1]["content"]
+        text = f"```json\n{fake_campaign_json(prompt)}\n```"
+        if stream:
+            events = [SimpleNamespace(
+                type="message_start", message=SimpleNamespace(usage=SimpleNamespace(input_tokens=len(prompt) // 4))
+            )]
+            events += [
+                SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(type="text_delta", text=chunk))
+                for chunk in fake_chunks(text)
+            ]
+            events.append(SimpleNamespace(type="message_delta", usage=SimpleNamespace(output_tokens=len(text) // 4)))
+            return _FakeStream(events, self._owner.call_latency(), self._owner.stats)
+
+        with self._owner.stats:
+            await asyncio.sleep(self._owner.call_latency())
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=text)],
+            usage=SimpleNamespace(input_tokens=len(prompt) // 4, output_tokens=len(text) // 4),
+        )
+
+
+class _FakeClient:
+    def __init__(self, latency: float = 1.0, tail_latency: float = 0.0, tail_rate: float = 0.0):
+        self.latency = latency
+        self.tail_latency = tail_latency
+        self.tail_rate = tail_rate
+        self.stats = FakeProviderStats()
+
+    def call_latency(self) -> float:
+        return fake_latency(self.latency, self.tail_latency, self.tail_rate)
+
+
+class FakeAsyncAnthropic(_FakeClient):
+    """Offline stand-in for AsyncAnthropic exposing messages.create"""
+
+    def __init__(self, latency: float = 1.0, tail_latency: float = 0.0, tail_rate: float = 0.0):
+        super().__init__(latency, tail_latency, tail_rate)
+        self.messages = _FakeMessages(self)
+
+
+class _FakeCompletions:
+    def __init__(self, owner: "FakeAsyncOpenAI"):
+        self._owner = owner
+
+    async def create(self, model: str, messages: list, stream: bool = False, **kwargs):
+        prompt = messages[-1]["content"]
+        text = fake_campaign_json(prompt)
+        if stream:
+            events = [
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))], usage=None)
+                for chunk in fake_chunks(text)
+            ]
+            events.append(SimpleNamespace(
+                choices=[],
+                usage=SimpleNamespace(prompt_tokens=len(prompt) // 4, completion_tokens=len(text) // 4),
+            ))
+            return _FakeStream(events, self._owner.call_latency(), self._owner.stats)
+
+        with self._owner.stats:
+            await asyncio.sleep(self._owner.call_latency())
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+            usage=SimpleNamespace(prompt_tokens=len(prompt) // 4, completion_tokens=len(text) // 4),
+        )
+
+
+class _FakeImages:
+    def __init__(self, owner: "FakeAsyncOpenAI"):
+        self._owner = owner
+
+    async def generate(self, model: str, prompt: str, **kwargs):
+        with self._owner.stats:
+            await asyncio.sleep(self._owner.call_latency())
+        return SimpleNamespace(data=[SimpleNamespace(url=f"https://images.invalid/{uuid.uuid4().hex}.png")])
+
+
+class FakeAsyncOpenAI(_FakeClient):
+    """Offline stand-in for AsyncOpenAI exposing chat.completions.create and images.generate"""
+
+    def __init__(self, latency: float = 1.0, tail_latency: float = 0.0, tail_rate: float = 0.0):
+        super().__init__(latency, tail_latency, tail_rate)
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
+        self.images = _FakeImages(self)
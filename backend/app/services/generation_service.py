@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from app.models.campaign import (
+    Campaign,
+    CampaignContent,
+    CampaignFromURL,
+    Platform,
+)
+from app.services import metrics
+from app.services.ai_service import AIService
+from app.services.campaign_service import CampaignService
+from app.services.scraper_service import PageContent, ScraperService, WebsiteContent
+
+# Receives (event name, JSON-serializable payload) as the pipeline progresses
+EventCallback = Callable[[str, dict], None]
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationService:
+    """Runs the scrape -> AI -> images -> build pipeline for a website"""
+
+    def __init__(self, scraper_service: ScraperService, ai_service: AIService, campaign_service: CampaignService):
+        self.scraper_service = scraper_service
+        self.ai_service = ai_service
+        self.campaign_service = campaign_service
+
+    async def generate_from_url(
+        self,
+        request: CampaignFromURL,
+        on_event: Optional[EventCallback] = None,
+        website_content: Optional[WebsiteContent] = None,
+    ) -> Campaign:
+        """Generate and save a campaign for a website.
+
+        Pass ``website_content`` to reuse a crawl that has already been done.
+
+        When ``on_event`` is given it receives a ``page`` event per crawled
+        page, a ``website`` event once the site has been analyzed, a
+        ``content`` event per platform, an ``image`` event per generated
+        image and finally a ``campaign`` event with the saved campaign.
+
+        Platforms are emitted, and their images started, as soon as each
+        one has streamed in from the LLM, so image generation overlaps the
+        rest of the completion. The ``campaign`` event is authoritative.
+        """
+        emit = on_event or (lambda event, data: None)
+        started = time.perf_counter()
+
+        def on_page(page: PageContent) -> None:
+            emit("page", {"url": page.url, "title": page.title})
+
+        # Step 1: Scrape the website
+        if website_content is None:
+            website_content = await self.scraper_service.scrape_website(request.website_url, on_page=on_page)
+        emit("website", {
+            "brand_name": website_content.brand_name,
+            "tagline": website_content.tagline,
+            "description": website_content.description,
+            "products_services": website_content.products_services,
+            "key_features": website_content.key_features,
+            "images": website_content.images,
+            "pages_crawled": website_content.pages_crawled,
+            "pages_deduped": website_content.pages_deduped,
+        })
+
+        # Step 2: Generate campaign content using AI, starting each platform's image as its content arrives
+        streamed: Dict[int, CampaignContent] = {}
+
+        def on_image(index: int, image_url: Optional[str]) -> None:
+            emit("image", {"index": index, "platform": streamed[index].platform.value, "url": image_url})
+
+        images = self.ai_service.image_batch(website_content.brand_name, on_image) if request.generate_images else None
+
+        def on_content(index: int, item: dict) -> None:
+            streamed[index] = self._build_content(item)
+            emit("content", {"index": index, **streamed[index].model_dump(mode="json")})
+            if images is not None:
+                images.start(index, item)
+
+        platform_values = [p.value for p in request.platforms]
+        try:
+            ai_result = await self.ai_service.generate_campaign_from_website(
+                website_content,
+                platform_values,
+                request.campaign_type.value,
+                use_cache=not request.bypass_cache,
+                on_content=on_content,
+            )
+
+            # Step 3: Build campaign content, correcting any item that differs from what was streamed
+            # (a retry, a hedge won by the other provider, or fallback content can replace it)
+            items = ai_result.get("content", [])
+            content = [self._build_content(item) for item in items]
+            for index, platform_content in enumerate(content):
+                if streamed.get(index) != platform_content:
+                    streamed[index] = platform_content
+                    emit("content", {"index": index, **platform_content.model_dump(mode="json")})
+
+            # Step 4: Wait for the images
+            if images is not None:
+                image_urls = await images.results(items)
+                for platform_content, image_url in zip(content, image_urls):
+                    platform_content.generated_image_url = image_url
+        finally:
+            if images is not None:
+                images.cancel()
+
+        # Step 5: Create and save campaign
+        campaign = Campaign(
+            id=str(uuid.uuid4()),
+            name=ai_result.get("campaign_name", f"{website_content.brand_name} Campaign"),
+            campaign_type=request.campaign_type,
+            product_name=website_content.brand_name,
+            target_audience=ai_result.get("target_audience", "General audience"),
+            content=content,
+            website_url=request.website_url,
+            website_images=[img for img in website_content.images[:5]],
+            created_at=datetime.utcnow()
+        )
+
+        with metrics.STAGE_SECONDS.time("save"):
+            await asyncio.to_thread(self.campaign_service.save_campaign, campaign)
+        emit("campaign", campaign.model_dump(mode="json"))
+
+        elapsed = time.perf_counter() - started
+        metrics.STAGE_SECONDS.observe("generate", value=elapsed)
+        logger.info(
+            "generation.done campaign_id=%s url=%s platforms=%d seconds=%.3f",
+            campaign.id, request.website_url, len(content), elapsed,
+        )
+        return campaign
+
+    def _build_content(self, item: dict) -> CampaignContent:
+        """Map one AI content item onto CampaignContent"""
+        # Map platform string to enum
+        platform_str = item.get("platform", "facebook")
+        try:
+            platform = Platform(platform_str)
+        except ValueError:
+            platform = Platform.FACEBOOK
+
+        return CampaignContent(
+            platform=platform,
+            headline=item.get("headline", ""),
+            body=item.get("body", ""),
+            hashtags=item.get("hashtags", []),
+            call_to_action=item.get("call_to_action", "Learn More"),
+            image_suggestions=item.get("image_suggestions", []),
+        )
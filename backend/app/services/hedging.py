@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Hashable, List, TypeVar
+
+from app.services import metrics
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyWindow:
+    """The most recent ``size`` latencies of one kind of call"""
+
+    def __init__(self, size: int = 200):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile (q in 0..100) of the window"""
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def expected_beyond(self, seconds: float) -> float:
+        """Mean of the samples slower than ``seconds`` (or ``seconds`` itself if there are none)"""
+        slower = [sample for sample in self.samples if sample > seconds]
+        return sum(slower) / len(slower) if slower else seconds
+
+
+class HedgeBudget:
+    """Caps hedges at ``ratio`` extra calls per hedgeable call.
+
+    Every call earns ``ratio`` credit and every hedge spends one, with at
+    most ``burst`` credits banked, so a slow spell can use a short burst
+    of hedges but never more than the ratio over time.
+    """
+
+    def __init__(self, ratio: float, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.credits = min(burst, 1.0)
+
+    def earn(self) -> None:
+        self.credits = min(self.burst, self.credits + self.ratio)
+
+    def spend(self) -> bool:
+        if self.credits < 1.0:
+            return False
+        self.credits -= 1.0
+        return True
+
+
+@dataclass
+class HedgeStats:
+    """Counters for hedged calls"""
+    calls: int = 0
+    hedged: int = 0
+    denied: int = 0
+    secondary_wins: int = 0
+    latency_saved: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "denied": self.denied,
+            "secondary_wins": self.secondary_wins,
+            "hedge_rate": round(self.hedged / self.calls, 4) if self.calls else 0.0,
+            "latency_saved_seconds": round(self.latency_saved, 3),
+        }
+
+
+class Hedger:
+    """Runs a call on a primary provider and, if it is slow or fails, races it against a secondary.
+
+    The secondary is fired once the primary has been running longer than
+    the ``percentile`` of its recent latencies for the same kind of call
+    (``initial_delay`` until ``min_samples`` have been seen), or straight
+    away if the primary fails first. The first successful result wins and
+    the other call is cancelled. Extra calls are limited by a HedgeBudget.
+
+    Latency saved by a secondary win is estimated as the mean of the
+    primary's recent latencies beyond the time the secondary answered,
+    minus that time: the primary is cancelled, so its own finish is never
+    observed.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        budget_ratio: float = 0.1,
+        initial_delay: float = 10.0,
+        min_delay: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        self.percentile = percentile
+        self.budget = HedgeBudget(budget_ratio)
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.stats = HedgeStats()
+        self._latencies: Dict[Hashable, LatencyWindow] = {}
+
+    def latencies(self, key: Hashable) -> LatencyWindow:
+        if key not in self._latencies:
+            self._latencies[key] = LatencyWindow(self.window)
+        return self._latencies[key]
+
+    def observe(self, key: Hashable, seconds: float) -> None:
+        """Record the latency of a completed (uncached) call"""
+        self.latencies(key).add(seconds)
+
+    def delay(self, key: Hashable) -> float:
+        """How long to give the primary before hedging"""
+        window = self.latencies(key)
+        if len(window) < self.min_samples:
+            return self.initial_delay
+        return max(self.min_delay, window.percentile(self.percentile))
+
+    async def run(
+        self,
+        primary: str,
+        secondary: str,
+        call: Callable[[str], Awaitable[T]],
+        key: Callable[[str], Hashable],
+    ) -> T:
+        """Return ``call(primary)``, hedged with ``call(secondary)``; ``key(provider)`` names its latency window"""
+        self.stats.calls += 1
+        self.budget.earn()
+        started = time.monotonic()
+        deadline = started + self.delay(key(primary))
+        tasks = {asyncio.create_task(call(primary)): primary}
+        can_hedge, hedged = True, False
+        errors: List[BaseException] = []
+
+        try:
+            while tasks:
+                timeout = max(0.0, deadline - time.monotonic()) if can_hedge else None
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider = tasks.pop(task)
+                    if task.exception() is None:
+                        if hedged:
+                            self._record_win(primary, provider, key, started)
+                        return task.result()
+                    errors.append(task.exception())
+
+                if can_hedge and (not done or not tasks):
+                    # The primary is slow, or failed before it was hedged
+                    can_hedge = False
+                    trigger = "failed" if done else "slow"
+                    if self.budget.spend():
+                        hedged = True
+                        self.stats.hedged += 1
+                        metrics.HEDGES.inc(trigger)
+                        logger.info(
+                            "ai.hedge primary=%s secondary=%s trigger=%s after=%.2f",
+                            primary, secondary, trigger, time.monotonic() - started,
+                        )
+                        tasks[asyncio.create_task(call(secondary))] = secondary
+                    else:
+                        self.stats.denied += 1
+                        metrics.HEDGES.inc("denied")
+            raise errors[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _record_win(self, primary: str, winner: str, key: Callable[[str], Hashable], started: float) -> None:
+        metrics.HEDGE_WINS.inc("primary" if winner == primary else "secondary")
+        if winner != primary:
+            self.stats.secondary_wins += 1
+            elapsed = time.monotonic() - started
+            saved = self.latencies(key(primary)).expected_beyond(elapsed) - elapsed
+            self.stats.latency_saved += saved
+            metrics.HEDGE_LATENCY_SAVED.inc(amount=saved)
+
@@ -0,0 +1,278 @@
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.models.campaign import CampaignFromURL
+from app.models.job import Job, JobStatus
+from app.services.generation_service import GenerationService
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its depth limit"""
+
+
+class JobStore:
+    """SQLite-backed job records, so queued work survives a restart.
+
+    Several worker processes can share one database. A queued job is
+    claimed with a conditional update, so exactly one process runs it.
+    A running job records its owner and a lease (a wall-clock deadline)
+    that the owner keeps renewing. A running job whose lease has run out
+    belonged to a process that is gone, and is queued again. Outcomes
+    are only written while the job is still running under the same
+    owner, so a cancellation is never overwritten.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at TEXT NOT NULL, data TEXT NOT NULL,"
+            " owner TEXT, lease_until REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+
+    def _update(self, sql: str, params: tuple) -> bool:
+        """Run a conditional UPDATE; True if it changed a row"""
+        with self._lock:
+            return self._db.execute(sql, params).rowcount > 0
+
+    def add(self, job: Job) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, created_at, data) VALUES (?, ?, ?, ?)",
+                (job.id, job.status.value, job.created_at.isoformat(), job.model_dump_json()),
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.model_validate_json(row[0]) if row else None
+
+    def queued(self) -> List[Job]:
+        """Queued jobs, oldest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT data FROM jobs WHERE status = ? ORDER BY created_at", (JobStatus.QUEUED.value,)
+            ).fetchall()
+        return [Job.model_validate_json(row[0]) for row in rows]
+
+    def claim(self, job: Job, owner: str, lease_until: float) -> bool:
+        """Mark a queued job as running for ``owner``; False if it was claimed or cancelled meanwhile"""
+        return self._update(
+            "UPDATE jobs SET status = ?, data = ?, owner = ?, lease_until = ? WHERE id = ? AND status = ?",
+            (JobStatus.RUNNING.value, job.model_dump_json(), owner, lease_until, job.id, JobStatus.QUEUED.value),
+        )
+
+    def renew(self, owner: str, job_ids: Iterable[str], lease_until: float) -> Set[str]:
+        """Extend the leases of ``owner``'s running jobs; returns the ones it still holds"""
+        held = set()
+        for job_id in job_ids:
+            if self._update(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = ? AND owner = ?",
+                (lease_until, job_id, JobStatus.RUNNING.value, owner),
+            ):
+                held.add(job_id)
+        return held
+
+    def release(self, owner: str) -> None:
+        """Expire ``owner``'s leases (on shutdown) so its running jobs resume right away"""
+        self._update(
+            "UPDATE jobs SET lease_until = 0 WHERE owner = ? AND status = ?", (owner, JobStatus.RUNNING.value)
+        )
+
+    def finish(self, job: Job, owner: str) -> bool:
+        """Record a finished job's outcome unless it was cancelled or taken over meanwhile"""
+        return self._update(
+            "UPDATE jobs SET status = ?, data = ?, owner = NULL, lease_until = NULL"
+            " WHERE id = ? AND status = ? AND owner = ?",
+            (job.status.value, job.model_dump_json(), job.id, JobStatus.RUNNING.value, owner),
+        )
+
+    def cancel(self, job: Job) -> bool:
+        """Record a cancellation unless the job has finished meanwhile"""
+        return self._update(
+            "UPDATE jobs SET status = ?, data = ?, owner = NULL, lease_until = NULL"
+            " WHERE id = ? AND status IN (?, ?)",
+            (job.status.value, job.model_dump_json(), job.id, JobStatus.QUEUED.value, JobStatus.RUNNING.value),
+        )
+
+    def recover(self, now: float) -> List[Job]:
+        """Queue running jobs whose owner's lease has run out again; returns the ones requeued"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT data FROM jobs WHERE status = ? AND (lease_until IS NULL OR lease_until < ?)",
+                (JobStatus.RUNNING.value, now),
+            ).fetchall()
+
+        recovered = []
+        for row in rows:
+            job = Job.model_validate_json(row[0])
+            job.status = JobStatus.QUEUED
+            job.started_at = None
+            if self._update(
+                "UPDATE jobs SET status = ?, data = ?, owner = NULL, lease_until = NULL"
+                " WHERE id = ? AND status = ? AND (lease_until IS NULL OR lease_until < ?)",
+                (job.status.value, job.model_dump_json(), job.id, JobStatus.RUNNING.value, now),
+            ):
+                recovered.append(job)
+        return recovered
+
+
+class JobService:
+    """Bounded in-process worker pool for background campaign generation.
+
+    JobStore calls block on SQLite, so the async methods run them in a
+    thread to keep the event loop free.
+    """
+
+    def __init__(
+        self,
+        generation_service: GenerationService,
+        path: Optional[str] = None,
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_queue_depth: Optional[int] = None,
+        lease: Optional[float] = None,
+    ):
+        self.generation_service = generation_service
+        self.store = JobStore(path or os.getenv("JOB_DB_PATH", "jobs.db"))
+        self.workers = workers or int(os.getenv("JOB_WORKERS", "4"))
+        self.timeout = timeout or float(os.getenv("JOB_TIMEOUT_SECONDS", "300"))
+        self.max_queue_depth = max_queue_depth or int(os.getenv("JOB_MAX_QUEUE_DEPTH", "100"))
+        self.lease = lease or float(os.getenv("JOB_LEASE_SECONDS", "60"))
+        # Identifies this process's claims in the shared store
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._queued = 0
+        self._running: Dict[str, asyncio.Task] = {}
+        self._workers: List[asyncio.Task] = []
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Queue unfinished jobs from the store and start the workers"""
+        # Running jobs whose owner is gone (an expired lease) are run again from the start
+        await asyncio.to_thread(self.store.recover, time.time())
+        for job in await asyncio.to_thread(self.store.queued):
+            self._enqueue(job.id)
+
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._heartbeat = asyncio.create_task(self._keep_leases())
+
+    async def stop(self) -> None:
+        """Stop the workers. Running jobs stay marked running and resume on the next start."""
+        tasks = [*self._workers, self._heartbeat] if self._heartbeat else self._workers
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._heartbeat = None
+        await asyncio.to_thread(self.store.release, self.owner)
+
+    async def submit(self, request: CampaignFromURL) -> Job:
+        """Queue a generation job, or raise QueueFullError when the queue is full"""
+        if self._queued >= self.max_queue_depth:
+            raise QueueFullError(f"Job queue is full ({self.max_queue_depth} queued jobs)")
+
+        job = Job(id=str(uuid.uuid4()), status=JobStatus.QUEUED, request=request, created_at=datetime.utcnow())
+        await asyncio.to_thread(self.store.add, job)
+        self._enqueue(job.id)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    async def cancel_job(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued or running job. Finished jobs are returned unchanged."""
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or job.status not in (JobStatus.QUEUED, JobStatus.RUNNING):
+            return job
+
+        job.status = JobStatus.CANCELLED
+        job.finished_at = datetime.utcnow()
+        if not await asyncio.to_thread(self.store.cancel, job):
+            return await asyncio.to_thread(self.store.get, job_id)  # finished meanwhile
+
+        # A job running in another process is stopped by that process's next lease renewal
+        task = self._running.get(job_id)
+        if task:
+            task.cancel()
+        return job
+
+    def stats(self) -> dict:
+        return {"queued": self._queued, "running": len(self._running), "workers": len(self._workers)}
+
+    def _enqueue(self, job_id: str) -> None:
+        self._queued += 1
+        self._queue.put_nowait(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._queued -= 1
+            job = await asyncio.to_thread(self.store.get, job_id)
+            if job is None or job.status != JobStatus.QUEUED:
+                continue  # Cancelled while waiting, or run by another process
+
+            job.status = JobStatus.RUNNING
+            job.started_at = datetime.utcnow()
+            if not await asyncio.to_thread(self.store.claim, job, self.owner, time.time() + self.lease):
+                continue  # Another process claimed it first
+            await self._run(job)
+
+    async def _keep_leases(self) -> None:
+        """Renew the leases on our running jobs and pick up jobs orphaned by other processes"""
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            running = list(self._running)
+            held = await asyncio.to_thread(self.store.renew, self.owner, running, time.time() + self.lease)
+            for job_id in running:
+                task = self._running.get(job_id)
+                if job_id not in held and task:
+                    # Cancelled by another process (or our lease lapsed and the job was requeued)
+                    logger.info("jobs.lost_lease job_id=%s", job_id)
+                    task.cancel()
+            for job in await asyncio.to_thread(self.store.recover, time.time()):
+                logger.info("jobs.recovered job_id=%s", job.id)
+                self._enqueue(job.id)
+
+    async def _run(self, job: Job) -> None:
+        """Run one job under the per-job timeout and record its outcome"""
+        task = asyncio.create_task(self.generation_service.generate_from_url(job.request))
+        self._running[job.id] = task
+        try:
+            done, _ = await asyncio.wait({task}, timeout=self.timeout)
+        except asyncio.CancelledError:
+            # Worker shutdown: leave the job marked running so it is retried on restart
+            task.cancel()
+            raise
+        finally:
+            self._running.pop(job.id, None)
+
+        if task.cancelled():
+            return  # the cancellation has already been recorded
+
+        if not done:
+            task.cancel()
+            job.status = JobStatus.FAILED
+            job.error = f"Timed out after {self.timeout:g} seconds"
+        elif task.exception() is not None:
+            job.status = JobStatus.FAILED
+            job.error = str(task.exception())
+        else:
+            job.status = JobStatus.SUCCEEDED
+            job.campaign_id = task.result().id
+        job.finished_at = datetime.utcnow()
+        if not await asyncio.to_thread(self.store.finish, job, self.owner):
+            logger.info("jobs.outcome_discarded job_id=%s status=%s", job.id, job.status.value)
@@ -0,0 +1,92 @@
+import json
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingArrayParser:
+    """Pulls the objects of one top-level array out of a JSON reply while it is still streaming.
+
+    Feed text chunks as they arrive; ``feed`` returns the elements of the
+    array under ``key`` (an object member of the outermost JSON object)
+    that completed in that chunk. Anything before the first ``{``, such
+    as a ```json fence, is skipped. The parser only tracks nesting and
+    string state; each element is decoded with ``json.loads`` once its
+    closing brace arrives, so the full reply should still be parsed at
+    the end to validate it.
+    """
+
+    def __init__(self, key: str = "content"):
+        self.key = key
+        self.buffer = ""
+        self.pos = 0
+        self.stack: List[str] = []
+        self.in_string = False
+        self.escaped = False
+        self.string_start = 0
+        self.last_string: Optional[str] = None  # last complete string directly inside the outer object
+        self.in_array = False
+        self.item_start: Optional[int] = None
+        self.done = False
+
+    def feed(self, chunk: str) -> List[dict]:
+        self.buffer += chunk
+        items: List[dict] = []
+        buffer, stack = self.buffer, self.stack
+
+        for i in range(self.pos, len(buffer)):
+            if self.done:
+                break
+            char = buffer[i]
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    if len(stack) == 1:
+                        self.last_string = buffer[self.string_start:i]
+                continue
+
+            if not stack:
+                if char == "{":
+                    stack.append(char)
+                continue
+
+            if char == '"':
+                self.in_string = True
+                self.string_start = i + 1
+            elif char in "{[":
+                stack.append(char)
+                if len(stack) == 2 and char == "[" and self.last_string == self.key:
+                    self.in_array = True
+                elif len(stack) == 3 and char == "{" and self.in_array:
+                    self.item_start = i
+            elif char in "}]":
+                stack.pop()
+                if self.in_array and len(stack) == 2 and char == "}" and self.item_start is not None:
+                    item = self._decode(buffer[self.item_start:i + 1])
+                    if item is not None:
+                        items.append(item)
+                    self.item_start = None
+                elif self.in_array and len(stack) == 1:
+                    self.in_array = False
+                    self.done = True  # nothing after the array is needed
+                elif not stack:
+                    self.done = True
+            elif char == "," and len(stack) == 1:
+                self.last_string = None
+
+        self.pos = len(buffer)
+        return items
+
+    def _decode(self, text: str) -> Optional[dict]:
+        try:
+            item = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.debug("json_stream.bad_item error=%r", e)
+            return None
+        return item if isinstance(item, dict) else None
@@ -0,0 +1,280 @@
+import math
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Seconds, from a cached page to a slow LLM call
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+BYTES_BUCKETS = (16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216, 67_108_864)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally split by labels"""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    """Value that goes up and down, such as an in-flight count"""
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        self._values[labels] = value
+
+    @contextmanager
+    def track(self, *labels: str) -> Iterator[None]:
+        """Count the enclosed block as in flight"""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose samples are read from a callback when metrics are scraped"""
+    kind = "gauge"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str], callback: Callable[[], Dict[LabelValues, float]]
+    ):
+        super().__init__(name, help, labelnames)
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self.callback().items())
+        ]
+
+
+class CallbackCounter(CallbackGauge):
+    """Counter whose samples are read from a callback when metrics are scraped"""
+    kind = "counter"
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+ one for +Inf)], sum
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, *labels: str, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe the wall-clock duration of the enclosed block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(*labels, value=time.perf_counter() - start)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def totals(self) -> Dict[LabelValues, Tuple[int, float]]:
+        """(count, sum) of observations per label set"""
+        return {labels: (sum(counts), total[0]) for labels, (counts, total) in self._series.items()}
+
+    def render(self) -> List[str]:
+        lines = []
+        bucket_labels = self.labelnames + ("le",)
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(bucket_labels, labels + (_format_value(bound),))} {cumulative}"
+                )
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Named collection of metrics, rendered in the Prometheus text format.
+
+    Recording a sample is a dict lookup and an addition on the event loop
+    thread; formatting only happens when /metrics is scraped. Values that
+    already live elsewhere (cache stats, queue depths) are read by
+    callbacks at scrape time instead of being mirrored on every change.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name!r} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def callback_gauge(
+        self, name: str, help: str, labelnames: Sequence[str], callback: Callable[[], Dict[LabelValues, float]]
+    ) -> CallbackGauge:
+        """Register (or replace) a gauge read from ``callback`` at scrape time"""
+        self._metrics.pop(name, None)
+        return self.register(CallbackGauge(name, help, labelnames, callback))
+
+    def callback_counter(
+        self, name: str, help: str, labelnames: Sequence[str], callback: Callable[[], Dict[LabelValues, float]]
+    ) -> CallbackCounter:
+        """Register (or replace) a counter read from ``callback`` at scrape time"""
+        self._metrics.pop(name, None)
+        return self.register(CallbackCounter(name, help, labelnames, callback))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            samples = metric.render()
+            if samples:
+                lines.extend(metric.header())
+                lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Pipeline stages: crawl, fetch, parse, context, llm, image, save, generate (end to end)
+STAGE_SECONDS = REGISTRY.histogram(
+    "campaign_stage_duration_seconds", "Latency of each campaign pipeline stage", ("stage",)
+)
+
+CRAWL_PAGES = REGISTRY.histogram(
+    "scraper_crawl_pages", "Pages fetched per crawl, including skipped duplicates", buckets=COUNT_BUCKETS
+)
+CRAWL_BYTES = REGISTRY.histogram("scraper_crawl_bytes", "Bytes downloaded per crawl", buckets=BYTES_BUCKETS)
+PAGES_FETCHED = REGISTRY.counter(
+    "scraper_pages_total", "Page fetches by outcome (fetched, cached, not_modified, skipped, duplicate, error)",
+    ("outcome",),
+)
+BYTES_DOWNLOADED = REGISTRY.counter("scraper_bytes_downloaded_total", "Page body bytes downloaded")
+WEBSITE_IMAGES = REGISTRY.counter(
+    "website_images_total",
+    "Website image candidates by outcome (kept, duplicate, dropped, too_small, too_large, not_image, error)",
+    ("outcome",),
+)
+WEBSITE_IMAGE_BYTES = REGISTRY.counter("website_image_bytes_downloaded_total", "Website image bytes downloaded")
+FETCHES_IN_FLIGHT = REGISTRY.gauge("scraper_fetches_in_flight", "Page fetches currently in progress")
+
+LLM_CALLS = REGISTRY.counter(
+    "llm_calls_total", "LLM completions by provider and outcome (ok, error, cached)", ("provider", "outcome")
+)
+LLM_TOKENS = REGISTRY.counter("llm_tokens_total", "LLM tokens by provider and direction", ("provider", "direction"))
+LLM_IN_FLIGHT = REGISTRY.gauge("llm_calls_in_flight", "LLM calls currently in progress", ("provider",))
+
+PROVIDER_RETRIES = REGISTRY.counter(
+    "provider_retries_total", "Provider call attempts retried, by provider and cause (throttled, unavailable)",
+    ("provider", "outcome"),
+)
+PROVIDER_WAIT_SECONDS = REGISTRY.counter(
+    "provider_rate_limit_wait_seconds_total", "Time spent waiting for provider rate-limit buckets", ("provider",)
+)
+
+GENERATIONS = REGISTRY.counter(
+    "ai_generations_total", "Campaign generations by provider (or none when no provider is configured)",
+    ("provider",),
+)
+FALLBACKS = REGISTRY.counter(
+    "ai_fallbacks_total", "Campaigns or platforms that fell back to template content, by scope and reason",
+    ("scope", "reason"),
+)
+
+HEDGES = REGISTRY.counter(
+    "ai_hedges_total", "Hedge decisions: fired because the primary was slow or failed, or denied by the budget",
+    ("decision",),
+)
+HEDGE_WINS = REGISTRY.counter("ai_hedge_wins_total", "Which provider answered first on hedged calls", ("winner",))
+HEDGE_LATENCY_SAVED = REGISTRY.counter(
+    "ai_hedge_latency_saved_seconds_total", "Estimated latency saved by hedges the secondary provider won"
+)
+
+SINGLE_FLIGHT_CALLS = REGISTRY.counter(
+    "single_flight_calls_total", "Coalesced calls by boundary and role (leader did the work, follower joined)",
+    ("name", "role"),
+)
+
+IMAGE_CALLS = REGISTRY.counter("image_generations_total", "Image generations by outcome (ok, error)", ("outcome",))
+IMAGES_IN_FLIGHT = REGISTRY.gauge("image_generations_in_flight", "Image generations currently in progress")
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,341 @@
+import asyncio
+import logging
+import math
+import os
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+import anthropic
+import httpx
+import openai
+
+from app.services import metrics
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+CONNECTION_ERRORS = (anthropic.APIConnectionError, openai.APIConnectionError, httpx.TransportError, asyncio.TimeoutError)
+
+# Statuses worth retrying that mean the provider (not our request) is failing
+UNAVAILABLE_STATUSES = {408, 409, 500, 502, 503, 504, 529}
+
+# Longest Retry-After we are willing to sleep for, in seconds
+MAX_RETRY_AFTER = 60.0
+
+
+class ProviderError(Exception):
+    """Raised when a provider call fails after the gateway has done what it can"""
+
+    def __init__(self, provider: str, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class ProviderThrottledError(ProviderError):
+    """The provider kept rate limiting us; the request can be retried later"""
+
+
+class ProviderUnavailableError(ProviderError):
+    """The provider is down (errors or timeouts after retries, or its circuit is open)"""
+
+
+def classify_error(error: BaseException) -> str:
+    """'throttled', 'unavailable' or 'fatal' (not worth retrying)"""
+    status = getattr(error, "status_code", None)
+    if status == 429:
+        return "throttled"
+    if status in UNAVAILABLE_STATUSES or isinstance(error, CONNECTION_ERRORS):
+        return "unavailable"
+    return "fatal"
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, from retry-after-ms or Retry-After"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return min(float(headers["retry-after-ms"]) / 1000, MAX_RETRY_AFTER)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Allows ``per_minute`` units per minute, refilled continuously, bursting up to a minute's worth.
+
+    Waiters are served in arrival order. The balance may go negative when
+    a call turns out to cost more than estimated, which delays later calls.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Take ``amount`` units, waiting for them if needed; returns the seconds waited"""
+        amount = min(amount, self.capacity)  # an oversized call must still be able to run
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def adjust(self, amount: float) -> None:
+        """Return (positive) or charge (negative) units after the real cost is known"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class AdaptiveConcurrencyLimit:
+    """AIMD concurrency limit: grows by about one per limit's worth of successes, halves on throttling.
+
+    Decreases are spaced by ``cooldown`` seconds so one burst of 429s only
+    halves the limit once.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, backoff: float = 0.5, cooldown: float = 1.0):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    async def __aenter__(self) -> None:
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()  # pass the slot we were given on to someone else
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+
+    async def __aexit__(self, *exc) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def on_success(self) -> None:
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._wake()
+
+    def on_throttle(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+
+
+class CircuitBreaker:
+    """Stops calls to a provider after ``failure_threshold`` consecutive outages.
+
+    After ``reset_timeout`` seconds one probe call is let through; its
+    success closes the circuit and its failure re-opens it. Throttling and
+    bad requests are not outages and never trip the breaker.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, name: str = ""):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_started: Optional[float] = None
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead (claims the probe when half-open)"""
+        now = time.monotonic()
+        if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_started = None
+        if self.state == self.HALF_OPEN:
+            # A probe that never reported back (e.g. cancelled) is replaced after reset_timeout
+            if self._probe_started is not None and now - self._probe_started < self.reset_timeout:
+                return False
+            self._probe_started = now
+            return True
+        return self.state == self.CLOSED
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning("provider.circuit_open provider=%s failures=%d", self.name, self.failures)
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class ProviderGateway:
+    """Rate limiting, retries, adaptive concurrency and circuit breaking for one provider.
+
+    Every call waits for the requests-per-minute and tokens-per-minute
+    buckets and a slot under the adaptive concurrency limit. 429s and
+    outages (5xx, timeouts, connection errors) are retried with
+    exponential backoff and full jitter, honoring Retry-After. 429s also
+    shrink the concurrency limit. Calls that stay throttled raise
+    ProviderThrottledError; calls that keep failing count towards the
+    circuit breaker and raise ProviderUnavailableError.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 20,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.name = name
+        self.limit = AdaptiveConcurrencyLimit(max_concurrency)
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str, default_concurrency: int = 20) -> "ProviderGateway":
+        """Gateway configured from ``{prefix}_MAX_CONCURRENCY``/``_RPM``/``_TPM`` and the shared PROVIDER_* settings"""
+        return cls(
+            name,
+            max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", str(default_concurrency))),
+            requests_per_minute=float(os.getenv(f"{prefix}_RPM", "0")),
+            tokens_per_minute=float(os.getenv(f"{prefix}_TPM", "0")),
+            max_retries=int(os.getenv("PROVIDER_MAX_RETRIES", "4")),
+            backoff_base=float(os.getenv("PROVIDER_BACKOFF_BASE_SECONDS", "0.5")),
+            backoff_max=float(os.getenv("PROVIDER_BACKOFF_MAX_SECONDS", "30")),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("PROVIDER_BREAKER_FAILURES", "5")),
+                reset_timeout=float(os.getenv("PROVIDER_BREAKER_RESET_SECONDS", "30")),
+                name=name,
+            ),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def call(
+        self,
+        request: Callable[[], Awaitable[T]],
+        tokens: int = 0,
+        usage: Optional[Callable[[T], int]] = None,
+    ) -> T:
+        """Run ``request`` under the gateway's limits, retrying transient failures.
+
+        ``tokens`` is the estimated token cost charged up front; ``usage``
+        maps the result to its real cost so the bucket can be corrected.
+        """
+        if not self.breaker.allow():
+            raise ProviderUnavailableError(self.name, f"{self.name} is unavailable (circuit open)")
+
+        for attempt in range(self.max_retries + 1):
+            waited = 0.0
+            if self.requests:
+                waited += await self.requests.acquire()
+            if self.tokens and tokens:
+                waited += await self.tokens.acquire(tokens)
+            if waited:
+                metrics.PROVIDER_WAIT_SECONDS.inc(self.name, amount=waited)
+
+            try:
+                async with self.limit:
+                    result = await request()
+            except Exception as e:
+                outcome = classify_error(e)
+                if outcome == "fatal":
+                    raise
+                metrics.PROVIDER_RETRIES.inc(self.name, outcome)
+                if outcome == "throttled":
+                    self.limit.on_throttle()
+
+                delay = retry_after(e)
+                if attempt == self.max_retries or self.breaker.state == CircuitBreaker.OPEN:
+                    if outcome == "throttled":
+                        raise ProviderThrottledError(
+                            self.name, f"{self.name} is rate limiting requests", retry_after=delay
+                        ) from e
+                    self.breaker.record_failure()
+                    raise ProviderUnavailableError(self.name, f"{self.name} is unavailable: {e}") from e
+
+                delay = delay if delay is not None else self.backoff(attempt)
+                logger.info(
+                    "provider.retry provider=%s outcome=%s attempt=%d delay=%.2f error=%r",
+                    self.name, outcome, attempt + 1, delay, e,
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            self.limit.on_success()
+            self.breaker.record_success()
+            if usage is not None and self.tokens and tokens:
+                self.tokens.adjust(tokens - usage(result))
+            return result
+
+        raise AssertionError("unreachable")
+
+    def state(self) -> dict:
+        return {
+            "concurrency_limit": round(self.limit.limit, 2),
+            "in_flight": self.limit.in_flight,
+            "circuit": self.breaker.state,
+        }
+
+
+def retry_after_header(error: ProviderError, default: float = 30.0) -> str:
+    """Retry-After value to send our own clients for a provider error"""
+    return str(math.ceil(error.retry_after if error.retry_after is not None else default))
@@ -0,0 +1,139 @@
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional
+
+from pydantic import BaseModel
+
+from app.services.cache import CacheStats
+
+try:
+    import brotli
+except ImportError:  # optional; responses fall back to gzip
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1000
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    # mtime=0 keeps the output, and so its ETag, the same on every worker
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """The content codings we can produce that an Accept-Encoding header allows, best first"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return [coding for coding in supported if accepted.get(coding, accepted.get("*", 0.0)) > 0]
+
+
+@dataclass
+class CachedJSON:
+    """A serialized JSON body, its strong ETag and its compressed variants (built on first use)"""
+    body: bytes
+    etag: str
+    stored_at: float = field(default_factory=time.monotonic)
+    _encoded: Dict[str, bytes] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_model(cls, model: BaseModel) -> "CachedJSON":
+        # pydantic-core's serializer, the same one FastAPI uses for response models
+        body = model.model_dump_json().encode()
+        return cls(body=body, etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+
+    def variant(self, accept_encoding: str) -> Optional[str]:
+        """The content coding to send for an Accept-Encoding header, or None for the plain body"""
+        if len(self.body) < MIN_COMPRESS_BYTES:
+            return None
+        encodings = accepted_encodings(accept_encoding)
+        return encodings[0] if encodings else None
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        if encoding is None:
+            return self.body
+        if encoding not in self._encoded:
+            self._encoded[encoding] = compress(self.body, encoding)
+        return self._encoded[encoding]
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """Strong ETags must differ between content codings of the same body"""
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """Whether an If-None-Match header names any variant of this body"""
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags:
+            return True
+        return any(self.etag_for(encoding) in tags for encoding in (None, "gzip", "br"))
+
+
+class ResponseCache:
+    """Size-bounded LRU of serialized JSON responses.
+
+    Writes through the owning service invalidate entries straight away.
+    ``ttl`` bounds how long a change made by another worker process can
+    go unseen. ``version`` lets a reader that started before a write avoid
+    caching what it read: ``set`` is ignored once the version has moved.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[Hashable, CachedJSON]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[CachedJSON]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            if time.monotonic() - entry.stored_at >= self.ttl:
+                del self._entries[key]
+                self.stats.stale += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry
+
+    def set(self, key: Hashable, entry: CachedJSON, version: int) -> None:
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self.version += 1
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
@@ -1,12 +1,27 @@
 import asyncio
+import logging
+import os
 import re
-from typing import List, Optional
+import time
+from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
-from dataclasses import dataclass
+from urllib.robotparser import RobotFileParser
+from dataclasses import asdict, dataclass, field
 
 import httpx
 from bs4 import BeautifulSoup
 
+from app.services.cache import TieredCache
+from app.services import metrics
+from app.services.crawl_frontier import CrawlFrontier, normalize_url, parse_sitemap, score_link, url_depth
+from app.services.image_service import ImageService, ImageStore
+from app.services.simhash import SimHashIndex, simhash
+from app.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class PageContent:
@@ -18,6 +33,8 @@ class PageContent:
     paragraphs: List[str]
     images: List[dict]  # {url, alt}
     links: List[str]
+    link_texts: Dict[str, str] = field(default_factory=dict)  # link -> anchor text
+    fingerprint: Optional[int] = None  # SimHash of headings and paragraphs
 
 
 @dataclass
@@ -29,134 +46,601 @@ class WebsiteContent:
     description: str
     products_services: List[str]
     key_features: List[str]
-    images: List[dict]
+    images: List[dict]  # {url, source_url, alt, width, height} thumbnails, best first
     pages_crawled: int
+    pages_deduped: int = 0
+    paragraphs: List[str] = field(default_factory=list)  # all page text, for the context builder
+
+
+@dataclass
+class CrawlState:
+    """Per-request crawl bookkeeping (frontier, robots rules, fingerprints and results)"""
+    base_url: str
+    max_pages: int
+    fingerprints: SimHashIndex
+    frontier: CrawlFrontier = field(default_factory=CrawlFrontier)
+    pages: Dict[int, PageContent] = field(default_factory=dict)
+    robots: Optional[RobotFileParser] = None
+    fetches: int = 0
+    deduped: int = 0
+    bytes_downloaded: int = 0
+
+    def is_duplicate(self, page: PageContent) -> bool:
+        """Whether a near-identical page was already crawled; remembers new pages"""
+        if page.fingerprint is None:
+            return False
+        original = self.fingerprints.find(page.fingerprint)
+        if original is not None:
+            logger.info("crawl.duplicate url=%s original=%s", page.url, original)
+            metrics.PAGES_FETCHED.inc("duplicate")
+            self.deduped += 1
+            return True
+        self.fingerprints.add(page.fingerprint, page.url)
+        return False
+
+    def enqueue(self, url: str, score: float, depth: int) -> None:
+        """Add a URL to the frontier unless it was already seen or robots.txt disallows it"""
+        if self.robots is not None and not self.robots.can_fetch(USER_AGENT, url):
+            return
+        self.frontier.push(url, score, depth)
+
+    def ordered_pages(self) -> List[PageContent]:
+        """Crawled pages in the order their fetches started, capped at the page budget"""
+        return [self.pages[order] for order in sorted(self.pages)][:self.max_pages]
+
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+# Sitemap seeding limits: child sitemaps followed from an index, URLs taken
+MAX_CHILD_SITEMAPS = 3
+MAX_SITEMAP_URLS = 200
+
+# Image URLs handed to the image stage, and images kept per website
+MAX_IMAGE_CANDIDATES = 30
+MAX_WEBSITE_IMAGES = 10
+
+BINARY_EXTENSIONS = (
+    ".pdf", ".zip", ".gz", ".tar", ".rar", ".7z", ".dmg", ".exe", ".msi",
+    ".mp4", ".mov", ".avi", ".webm", ".mp3", ".wav",
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".ico",
+    ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".csv", ".xml", ".json",
+)
+
+
+def parse_page(url: str, base_url: str, body: bytes, encoding: Optional[str] = None) -> Optional[PageContent]:
+    """Parse a raw HTML body into PageContent.
+
+    ``encoding`` is the charset declared in the Content-Type header, if
+    any; otherwise BeautifulSoup detects it from the BOM or <meta> tags.
+    Kept at module level and free of service state so it can run inline,
+    in a thread pool or in a process pool.
+    """
+    try:
+        soup = BeautifulSoup(body, "lxml", from_encoding=encoding)
+
+        # Remove script and style elements
+        for element in soup(["script", "style", "nav", "footer", "header"]):
+            element.decompose()
+
+        # Extract title
+        title = ""
+        if soup.title:
+            # A plain str: a NavigableString drags the whole tree along when pickled
+            title = str(soup.title.string or "")
+
+        # Extract meta description
+        description = ""
+        meta_desc = soup.find("meta", attrs={"name": "description"})
+        if meta_desc:
+            description = meta_desc.get("content", "")
+
+        # Extract headings
+        headings = []
+        for tag in ["h1", "h2", "h3"]:
+            for heading in soup.find_all(tag):
+                text = heading.get_text(strip=True)
+                if text and len(text) > 3:
+                    headings.append(text)
+
+        # Extract paragraphs
+        paragraphs = []
+        for p in soup.find_all("p"):
+            text = p.get_text(strip=True)
+            if text and len(text) > 50:  # Filter short paragraphs
+                paragraphs.append(text)
+
+        # Extract images
+        images = []
+        for img in soup.find_all("img"):
+            src = img.get("src", "")
+            if src:
+                full_url = urljoin(url, src)
+                alt = img.get("alt", "")
+                if _is_valid_image(full_url):
+                    images.append({"url": full_url, "alt": alt})
+
+        # Extract internal links, with their anchor text for scoring
+        links = []
+        link_texts = {}
+        seen_links = set()
+        for a in soup.find_all("a", href=True):
+            href = a["href"]
+            full_url = urljoin(url, href)
+            if not full_url.startswith(base_url) or _is_binary_link(full_url):
+                continue
+            key = normalize_url(full_url)
+            if key in seen_links:
+                continue
+            seen_links.add(key)
+            links.append(full_url)
+            link_texts[full_url] = a.get_text(" ", strip=True)[:100]
+
+        return PageContent(
+            url=url,
+            title=title,
+            description=description,
+            headings=headings,
+            paragraphs=paragraphs[:10],  # Limit paragraphs
+            images=images[:20],  # Limit images
+            links=links[:50],  # Limit links
+            link_texts={link: link_texts[link] for link in links[:50]},
+            fingerprint=simhash(" ".join(headings + paragraphs)),
+        )
+
+    except Exception as e:
+        logger.warning("crawl.parse_failed url=%s error=%r", url, e)
+        return None
+
+
+def _is_binary_link(url: str) -> bool:
+    """Links whose extension says they are not HTML pages"""
+    path = urlparse(url).path.lower()
+    return path.endswith(BINARY_EXTENSIONS)
+
+
+def _is_valid_image(url: str) -> bool:
+    """Check if URL is a valid image"""
+    image_extensions = [".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg"]
+    lower_url = url.lower()
+
+    # Skip tiny images, icons, tracking pixels
+    skip_patterns = ["icon", "logo", "favicon", "tracking", "pixel", "1x1", "spacer"]
+    for pattern in skip_patterns:
+        if pattern in lower_url:
+            return False
+
+    return any(ext in lower_url for ext in image_extensions) or "image" in lower_url
+
+
+PARSE_MODES = ("inline", "thread", "process")
 
 
 class ScraperService:
     """Service for scraping and extracting content from websites"""
 
-    def __init__(self, max_pages: int = 10):
+    def __init__(
+        self,
+        max_pages: int = 10,
+        max_body_bytes: Optional[int] = None,
+        workers: Optional[int] = None,
+        per_host_limit: Optional[int] = None,
+        parse_mode: Optional[str] = None,
+        parse_workers: Optional[int] = None,
+    ):
         self.max_pages = max_pages
-        self.visited_urls = set()
+        self.max_body_bytes = max_body_bytes or int(os.getenv("SCRAPER_MAX_BODY_BYTES", str(2 * 1024 * 1024)))
+        self.workers = workers or int(os.getenv("SCRAPER_WORKERS", "5"))
+        self.per_host_limit = per_host_limit or int(os.getenv("SCRAPER_PER_HOST_LIMIT", "4"))
+
+        # Where HTML parsing runs: inline on the event loop, or in a thread/process pool.
+        # A process pool only pays for its pickling and startup on very large pages.
+        self.parse_mode = (parse_mode or os.getenv("SCRAPER_PARSE_MODE", "thread")).lower()
+        if self.parse_mode not in PARSE_MODES:
+            raise ValueError(f"Unknown parse mode {self.parse_mode!r}, expected one of {PARSE_MODES}")
+        self.parse_workers = parse_workers or int(os.getenv("SCRAPER_PARSE_WORKERS", str(os.cpu_count() or 2)))
+        self._parse_executor: Optional[Executor] = None
+
+        # Pages whose SimHash differs from an earlier page in at most this many bits are skipped
+        self.duplicate_distance = int(os.getenv("SCRAPER_DUPLICATE_DISTANCE", "3"))
+
+        # Crawl results are cached per normalized URL; expired pages are
+        # revalidated with conditional GETs instead of being refetched
+        cache_ttl = float(os.getenv("SCRAPE_CACHE_TTL_SECONDS", "900"))
+        cache_size = int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", "256"))
+        cache_path = os.getenv("SCRAPE_CACHE_PATH") or None
+        self.website_cache = TieredCache("website", cache_ttl, cache_size, cache_path)
+        self.page_cache = TieredCache("page", cache_ttl, cache_size * self.max_pages, cache_path)
+
+        # In-flight crawls by normalized URL, shared by concurrent requests
+        self._crawls: SingleFlight[WebsiteContent] = SingleFlight("scrape")
+
+        # Fetch, dedupe and thumbnail the images found on the crawled pages
+        self.image_service: Optional[ImageService] = None
+        if os.getenv("SCRAPER_IMAGES", "true").lower() == "true":
+            self.image_service = ImageService(
+                ImageStore(os.getenv("IMAGE_STORE_PATH", "image_store")),
+                max_images=MAX_WEBSITE_IMAGES,
+                max_bytes=int(os.getenv("SCRAPER_IMAGE_MAX_BYTES", str(5 * 1024 * 1024))),
+                workers=int(os.getenv("SCRAPER_IMAGE_WORKERS", "8")),
+                min_dimension=int(os.getenv("SCRAPER_IMAGE_MIN_DIMENSION", "100")),
+                duplicate_distance=int(os.getenv("SCRAPER_IMAGE_DUPLICATE_DISTANCE", "6")),
+            )
 
-    async def scrape_website(self, url: str) -> WebsiteContent:
-        """Scrape a website and extract relevant content for marketing"""
-        self.visited_urls.clear()
+    async def scrape_website(
+        self,
+        url: str,
+        on_page: Optional[Callable[[PageContent], None]] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        host_limits: Optional[Dict[str, asyncio.Semaphore]] = None,
+    ) -> WebsiteContent:
+        """Scrape a website and extract relevant content for marketing.
+
+        ``on_page`` is called with each page as soon as it has been crawled.
+        Pass ``client`` to reuse an HTTP client across several crawls, and
+        ``host_limits`` (from ``create_host_limits``) to cap their combined
+        requests per host.
+
+        Concurrent calls for the same normalized URL share one crawl (and
+        each still gets every ``on_page`` event). Calls with their own
+        ``client`` crawl separately, since the caller controls how long
+        that client stays open.
+        """
+        cache_key = normalize_url(url)
+        cached = self.website_cache.get(cache_key)
+        if cached is not None and self.website_cache.is_fresh(cached):
+            return WebsiteContent(**cached.value)
+
+        if client is not None:
+            return await self._crawl_website(url, cache_key, on_page, client, host_limits)
+        return await self._crawls.do(
+            cache_key, lambda emit: self._crawl_website(url, cache_key, emit), listener=on_page
+        )
+
+    async def _crawl_website(
+        self,
+        url: str,
+        cache_key: str,
+        on_page: Optional[Callable[[PageContent], None]] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        host_limits: Optional[Dict[str, asyncio.Semaphore]] = None,
+    ) -> WebsiteContent:
+        """Crawl and aggregate a website, then process its images, caching the result"""
+        if client is None:
+            async with self.create_client() as client:
+                return await self._crawl_website(url, cache_key, on_page, client, host_limits)
         base_url = self._get_base_url(url)
 
-        # Crawl pages
-        pages = await self._crawl_pages(url, base_url)
+        # Images are fetched and thumbnailed page by page while the crawl goes on
+        images = None
+        if self.image_service is not None:
+            images = self.image_service.collector(client, MAX_IMAGE_CANDIDATES)
 
-        # Aggregate content
-        return self._aggregate_content(base_url, pages)
+        def on_crawled(page: PageContent) -> None:
+            if images is not None:
+                images.add(page.images)
+            if on_page:
+                on_page(page)
 
-    async def _crawl_pages(self, start_url: str, base_url: str) -> List[PageContent]:
-        """Crawl multiple pages from the website"""
-        pages = []
-        urls_to_visit = [start_url]
+        try:
+            # Crawl pages
+            state = await self._crawl_pages(url, base_url, on_crawled, client, host_limits)
+            pages = state.ordered_pages()
 
-        async with httpx.AsyncClient(
+            # Aggregate content
+            website_content = self._aggregate_content(base_url, pages, state.deduped)
+
+            # Replace the candidate image URLs with the best distinct, locally stored thumbnails
+            if images is not None:
+                try:
+                    website_content.images = await images.results()
+                except Exception as e:
+                    # e.g. the image store is not writable; keep the candidate URLs as before
+                    logger.warning("images.stage_failed url=%s error=%r", base_url, e)
+                    website_content.images = website_content.images[:MAX_WEBSITE_IMAGES]
+            else:
+                website_content.images = website_content.images[:MAX_WEBSITE_IMAGES]
+        finally:
+            if images is not None:
+                images.cancel()
+        if pages:
+            self.website_cache.set(cache_key, asdict(website_content))
+        return website_content
+
+    def create_client(self, max_connections: Optional[int] = None) -> httpx.AsyncClient:
+        """HTTP client configured for crawling"""
+        max_connections = max_connections or self.workers
+        return httpx.AsyncClient(
             follow_redirects=True,
             timeout=30.0,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-        ) as client:
-            while urls_to_visit and len(pages) < self.max_pages:
-                url = urls_to_visit.pop(0)
-
-                if url in self.visited_urls:
-                    continue
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
 
-                self.visited_urls.add(url)
+    def create_host_limits(self) -> Dict[str, asyncio.Semaphore]:
+        """Per-host request limits, keyed by netloc; share one between crawls to cap them together"""
+        return defaultdict(lambda: asyncio.Semaphore(self.per_host_limit))
+
+    def cache_stats(self) -> dict:
+        """Hit/miss counters for the website and page caches"""
+        return {
+            "website": self.website_cache.stats.as_dict(),
+            "page": self.page_cache.stats.as_dict(),
+        }
+
+    async def _crawl_pages(
+        self,
+        start_url: str,
+        base_url: str,
+        on_page: Optional[Callable[[PageContent], None]] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        host_limits: Optional[Dict[str, asyncio.Semaphore]] = None,
+    ) -> CrawlState:
+        """Crawl multiple pages from the website concurrently.
+
+        The frontier is a priority queue: links that look like product,
+        feature or pricing pages (by path keywords, anchor text and depth)
+        are fetched before legal pages, logins and pagination. robots.txt
+        and the sitemap are fetched alongside the start page; robots rules
+        filter the frontier and sitemap URLs seed it.
+
+        Up to ``workers`` pages are fetched at once (at most ``per_host_limit``
+        per host, across every crawl sharing ``host_limits``), and no more
+        fetches are started than the remaining page budget allows.
+        Responses are processed (deduplicated, kept and their links queued)
+        strictly in the order their fetches started; one that arrives early
+        waits for the ones before it. New fetches are only started after
+        such a step, so given the same responses the pages crawled, the
+        ones that fill the budget and their order do not depend on which
+        response arrives first.
+
+        Near-duplicate pages (templated variants, paginated listings) are
+        detected by SimHash as they arrive. They do not count against the
+        page budget and their links are not followed; at most twice the
+        page budget is fetched in total.
+        """
+        if client is None:
+            async with self.create_client() as client:
+                return await self._crawl_pages(start_url, base_url, on_page, client, host_limits)
+        if host_limits is None:
+            host_limits = self.create_host_limits()
+
+        started = time.perf_counter()
+        state = CrawlState(
+            base_url=base_url,
+            max_pages=self.max_pages,
+            fingerprints=SimHashIndex(self.duplicate_distance),
+        )
+        # The user asked for this page, so it is crawled regardless of robots.txt
+        state.enqueue(start_url, float("inf"), 0)
+        discovery: Optional[asyncio.Task] = asyncio.create_task(self._discover(client, base_url))
+        in_flight: Dict[asyncio.Task, Tuple[int, str, int]] = {}
+        arrived: Dict[int, Tuple[asyncio.Task, str, int]] = {}  # finished fetches waiting for their turn
+        next_order = 0  # the fetch to process next
+
+        def start_fetches() -> None:
+            """Start fetches while there are free workers and page budget left"""
+            outstanding = len(in_flight) + len(arrived)
+            while (
+                state.frontier
+                and outstanding < self.workers
+                and len(state.pages) + outstanding < state.max_pages
+                and state.fetches < state.max_pages * 2
+            ):
+                _, url, depth = state.frontier.pop()
+                task = asyncio.create_task(self._fetch_with_host_limit(client, url, base_url, host_limits, state))
+                in_flight[task] = (state.fetches, url, depth)
+                state.fetches += 1
+                outstanding += 1
 
-                try:
-                    page_content = await self._scrape_page(client, url, base_url)
-                    if page_content:
-                        pages.append(page_content)
-
-                        # Add internal links to queue
-                        for link in page_content.links:
-                            if link not in self.visited_urls and link.startswith(base_url):
-                                urls_to_visit.append(link)
-                except Exception as e:
-                    print(f"Error scraping {url}: {e}")
+        try:
+            start_fetches()
+            while in_flight or arrived:
+                if next_order not in arrived:
+                    done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        order, url, depth = in_flight.pop(task)
+                        arrived[order] = (task, url, depth)
                     continue
 
-        return pages
+                # robots.txt must be known before any discovered link is queued
+                if discovery is not None:
+                    state.robots, seeds = await discovery
+                    discovery = None
+                    for seed in seeds:
+                        state.enqueue(seed, score_link(seed, depth=url_depth(seed)), url_depth(seed))
 
-    async def _scrape_page(self, client: httpx.AsyncClient, url: str, base_url: str) -> Optional[PageContent]:
-        """Scrape a single page"""
+                order = next_order
+                task, url, depth = arrived.pop(order)
+                next_order += 1
+                try:
+                    page_content = task.result()
+                except Exception as e:
+                    logger.warning("crawl.fetch_failed url=%s error=%r", url, e)
+                    metrics.PAGES_FETCHED.inc("error")
+                    page_content = None
+
+                if page_content and not state.is_duplicate(page_content):
+                    state.pages[order] = page_content
+                    if on_page:
+                        on_page(page_content)
+
+                    # Add internal links to the frontier, best candidates first
+                    for link in page_content.links:
+                        if link.startswith(base_url):
+                            score = score_link(link, page_content.link_texts.get(link, ""), depth + 1)
+                            state.enqueue(link, score, depth + 1)
+                start_fetches()
+        finally:
+            for task in in_flight:
+                task.cancel()
+            if discovery is not None:
+                discovery.cancel()
+
+        elapsed = time.perf_counter() - started
+        metrics.STAGE_SECONDS.observe("crawl", value=elapsed)
+        metrics.CRAWL_PAGES.observe(value=state.fetches)
+        metrics.CRAWL_BYTES.observe(value=state.bytes_downloaded)
+        logger.info(
+            "crawl.done base_url=%s pages=%d fetches=%d deduped=%d bytes=%d seconds=%.3f",
+            base_url, len(state.pages), state.fetches, state.deduped, state.bytes_downloaded, elapsed,
+        )
+        return state
+
+    async def _discover(
+        self, client: httpx.AsyncClient, base_url: str
+    ) -> Tuple[Optional[RobotFileParser], List[str]]:
+        """Fetch robots.txt and the sitemap(s) it lists, or /sitemap.xml.
+
+        Returns the parsed robots rules (None if unavailable) and up to
+        ``MAX_SITEMAP_URLS`` page URLs under ``base_url``. Failures only
+        mean the crawl falls back to following links.
+        """
+        robots = None
+        sitemaps = []
         try:
-            response = await client.get(url)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, "lxml")
-
-            # Remove script and style elements
-            for element in soup(["script", "style", "nav", "footer", "header"]):
-                element.decompose()
-
-            # Extract title
-            title = ""
-            if soup.title:
-                title = soup.title.string or ""
-
-            # Extract meta description
-            description = ""
-            meta_desc = soup.find("meta", attrs={"name": "description"})
-            if meta_desc:
-                description = meta_desc.get("content", "")
-
-            # Extract headings
-            headings = []
-            for tag in ["h1", "h2", "h3"]:
-                for heading in soup.find_all(tag):
-                    text = heading.get_text(strip=True)
-                    if text and len(text) > 3:
-                        headings.append(text)
-
-            # Extract paragraphs
-            paragraphs = []
-            for p in soup.find_all("p"):
-                text = p.get_text(strip=True)
-                if text and len(text) > 50:  # Filter short paragraphs
-                    paragraphs.append(text)
-
-            # Extract images
-            images = []
-            for img in soup.find_all("img"):
-                src = img.get("src", "")
-                if src:
-                    full_url = urljoin(url, src)
-                    alt = img.get("alt", "")
-                    if self._is_valid_image(full_url):
-                        images.append({"url": full_url, "alt": alt})
-
-            # Extract internal links
-            links = []
-            for a in soup.find_all("a", href=True):
-                href = a["href"]
-                full_url = urljoin(url, href)
-                if full_url.startswith(base_url) and full_url not in links:
-                    links.append(full_url)
-
-            return PageContent(
-                url=url,
-                title=title,
-                description=description,
-                headings=headings,
-                paragraphs=paragraphs[:10],  # Limit paragraphs
-                images=images[:20],  # Limit images
-                links=links[:20]  # Limit links
+            response = await client.get(urljoin(base_url, "/robots.txt"))
+            if response.status_code == 200:
+                robots = RobotFileParser()
+                robots.parse(response.text.splitlines())
+                sitemaps = robots.site_maps() or []
+            elif response.status_code in (401, 403):
+                # Same as RobotFileParser.read(): an access-restricted robots.txt disallows everything
+                robots = RobotFileParser()
+                robots.disallow_all = True
+        except httpx.HTTPError as e:
+            logger.warning("crawl.robots_failed base_url=%s error=%r", base_url, e)
+
+        seeds: List[str] = []
+        pending = sitemaps or [urljoin(base_url, "/sitemap.xml")]
+        children = 0
+        while pending and len(seeds) < MAX_SITEMAP_URLS:
+            sitemap_url = pending.pop(0)
+            try:
+                async with client.stream("GET", sitemap_url) as response:
+                    if response.status_code != 200:
+                        continue
+                    urls, is_index = parse_sitemap(await self._read_capped(response))
+            except httpx.HTTPError as e:
+                logger.warning("crawl.sitemap_failed url=%s error=%r", sitemap_url, e)
+                continue
+
+            if is_index:
+                for child in urls[:MAX_CHILD_SITEMAPS - children]:
+                    pending.append(child)
+                    children += 1
+                continue
+            seeds.extend(
+                url for url in urls
+                if url.startswith(base_url) and not _is_binary_link(url)
             )
 
-        except Exception as e:
-            print(f"Error parsing {url}: {e}")
-            return None
+        return robots, seeds[:MAX_SITEMAP_URLS]
+
+    async def _fetch_with_host_limit(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        base_url: str,
+        host_limits: Dict[str, asyncio.Semaphore],
+        state: Optional[CrawlState] = None,
+    ) -> Optional[PageContent]:
+        """Scrape a page while holding a connection slot for its host"""
+        async with host_limits[urlparse(url).netloc]:
+            with metrics.FETCHES_IN_FLIGHT.track():
+                return await self._scrape_page(client, url, base_url, state)
+
+    async def _scrape_page(
+        self, client: httpx.AsyncClient, url: str, base_url: str, state: Optional[CrawlState] = None
+    ) -> Optional[PageContent]:
+        """Fetch a single page and hand the raw body to the parse stage"""
+        cache_key = normalize_url(url)
+        cached = self.page_cache.get(cache_key)
+        if cached is not None and self.page_cache.is_fresh(cached):
+            metrics.PAGES_FETCHED.inc("cached")
+            return PageContent(**cached.value)
+
+        # Revalidate an expired entry with the validators it was stored with
+        headers = {}
+        if cached is not None:
+            if cached.meta.get("etag"):
+                headers["If-None-Match"] = cached.meta["etag"]
+            if cached.meta.get("last_modified"):
+                headers["If-Modified-Since"] = cached.meta["last_modified"]
+
+        fetch_started = time.perf_counter()
+        async with client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and cached is not None:
+                self.page_cache.touch(cache_key, cached)
+                metrics.PAGES_FETCHED.inc("not_modified")
+                return PageContent(**cached.value)
+            response.raise_for_status()
 
-    def _aggregate_content(self, base_url: str, pages: List[PageContent]) -> WebsiteContent:
+            # Skip non-HTML responses without downloading their bodies
+            content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+            if content_type and content_type not in HTML_CONTENT_TYPES:
+                logger.info("crawl.skipped url=%s content_type=%s", url, content_type)
+                metrics.PAGES_FETCHED.inc("skipped")
+                return None
+
+            body = await self._read_capped(response)
+            metrics.PAGES_FETCHED.inc("fetched")
+            metrics.BYTES_DOWNLOADED.inc(amount=len(body))
+            if state is not None:
+                state.bytes_downloaded += len(body)
+        metrics.STAGE_SECONDS.observe("fetch", value=time.perf_counter() - fetch_started)
+
+        with metrics.STAGE_SECONDS.time("parse"):
+            page_content = await self._parse(url, base_url, body, response.charset_encoding)
+        if page_content:
+            self.page_cache.set(cache_key, asdict(page_content), {
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+            })
+        return page_content
+
+    async def _read_capped(self, response: httpx.Response) -> bytes:
+        """Read a response body, stopping at max_body_bytes.
+
+        Oversized pages are cut off rather than dropped: the parser is
+        lenient and the start of a page carries most of its content.
+        """
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body += chunk
+            if len(body) >= self.max_body_bytes:
+                logger.info("crawl.truncated url=%s max_body_bytes=%d", response.url, self.max_body_bytes)
+                del body[self.max_body_bytes:]
+                break
+        return bytes(body)
+
+    async def _parse(self, url: str, base_url: str, body: bytes, encoding: Optional[str]) -> Optional[PageContent]:
+        """Run parse_page according to the configured parse mode"""
+        if self.parse_mode == "inline":
+            return parse_page(url, base_url, body, encoding)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_parse_executor(), parse_page, url, base_url, body, encoding)
+
+    def _get_parse_executor(self) -> Executor:
+        """Create the parse executor on first use"""
+        if self._parse_executor is None:
+            if self.parse_mode == "process":
+                self._parse_executor = ProcessPoolExecutor(max_workers=self.parse_workers)
+            else:
+                self._parse_executor = ThreadPoolExecutor(
+                    max_workers=self.parse_workers, thread_name_prefix="page-parser"
+                )
+        return self._parse_executor
+
+    def close(self) -> None:
+        """Shut down the parse executor, if one was started"""
+        if self._parse_executor is not None:
+            self._parse_executor.shutdown(wait=False, cancel_futures=True)
+            self._parse_executor = None
+
+    def _aggregate_content(self, base_url: str, pages: List[PageContent], pages_deduped: int = 0) -> WebsiteContent:
         """Aggregate content from multiple pages"""
         if not pages:
             return WebsiteContent(
@@ -167,7 +651,8 @@ class ScraperService:
                 products_services=[],
                 key_features=[],
                 images=[],
-                pages_crawled=0
+                pages_crawled=0,
+                pages_deduped=pages_deduped,
             )
 
         # Get brand name from first page title
@@ -195,6 +680,7 @@ class ScraperService:
             all_paragraphs.extend(page.paragraphs)
 
         tagline = all_paragraphs[0][:150] if all_paragraphs else ""
+        unique_paragraphs = list(dict.fromkeys(all_paragraphs))
 
         # Aggregate images
         all_images = []
@@ -212,24 +698,13 @@ class ScraperService:
             description=main_description,
             products_services=products_services,
             key_features=key_features,
-            images=all_images[:10],
-            pages_crawled=len(pages)
+            images=all_images[:MAX_IMAGE_CANDIDATES],
+            pages_crawled=len(pages),
+            pages_deduped=pages_deduped,
+            paragraphs=unique_paragraphs,
         )
 
     def _get_base_url(self, url: str) -> str:
         """Get the base URL from a full URL"""
         parsed = urlparse(url)
         return f"{parsed.scheme}://{parsed.netloc}"
-
-    def _is_valid_image(self, url: str) -> bool:
-        """Check if URL is a valid image"""
-        image_extensions = [".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg"]
-        lower_url = url.lower()
-
-        # Skip tiny images, icons, tracking pixels
-        skip_patterns = ["icon", "logo", "favicon", "tracking", "pixel", "1x1", "spacer"]
-        for pattern in skip_patterns:
-            if pattern in lower_url:
-                return False
-
-        return any(ext in lower_url for ext in image_extensions) or "image" in lower_url
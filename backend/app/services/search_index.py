@@ -0,0 +1,149 @@
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.models.campaign import Campaign
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens, matching SQLite's unicode61 tokenizer closely enough"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def normalize_hashtag(tag: str) -> str:
+    return "#" + tag.strip().lstrip("#").lower()
+
+
+def campaign_fields(campaign: Campaign) -> Dict[str, str]:
+    """Searchable text of a campaign, by field"""
+    return {
+        "product_name": campaign.product_name,
+        "name": campaign.name,
+        "headlines": " ".join(c.headline for c in campaign.content),
+        "bodies": " ".join(c.body for c in campaign.content),
+        "hashtags": " ".join(tag for c in campaign.content for tag in (c.hashtags or [])),
+    }
+
+
+def campaign_facets(campaign: Campaign) -> Dict[str, Set[str]]:
+    """Facet values of a campaign (platforms and normalized hashtags)"""
+    return {
+        "platform": {c.platform.value for c in campaign.content},
+        "hashtag": {normalize_hashtag(tag) for c in campaign.content for tag in (c.hashtags or []) if tag.strip("# ")},
+    }
+
+
+@dataclass
+class SearchResult:
+    """Ranked document ids for one page, plus totals and facet counts over all matches"""
+    hits: List[Tuple[str, float]]
+    total: int
+    facets: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+
+class SearchIndex:
+    """Incrementally maintained in-memory inverted index with BM25 ranking.
+
+    Queries only touch the postings of their terms, so lookup cost grows
+    with the number of matches rather than the number of documents.
+    """
+
+    # Field weights mirror the bm25() weights used by the SQLite store
+    FIELD_WEIGHTS = {"product_name": 2.0, "name": 2.0, "headlines": 3.0, "bodies": 1.0, "hashtags": 2.0}
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, float] = {}
+        self._total_length = 0.0
+        self._facets: Dict[str, Dict[str, Set[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def add(self, doc_id: str, fields: Dict[str, str], facets: Dict[str, Set[str]]) -> None:
+        """Index a document, replacing any previous version"""
+        self.remove(doc_id)
+
+        terms: Counter = Counter()
+        for name, text in fields.items():
+            weight = self.FIELD_WEIGHTS.get(name, 1.0)
+            for token in tokenize(text):
+                terms[token] += weight
+
+        for term, frequency in terms.items():
+            self._postings[term][doc_id] = frequency
+        self._doc_terms[doc_id] = terms
+        self._doc_lengths[doc_id] = sum(terms.values())
+        self._total_length += self._doc_lengths[doc_id]
+        self._facets[doc_id] = facets
+
+    def remove(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        self._facets.pop(doc_id, None)
+
+    def search(
+        self,
+        query: str,
+        filters: Optional[Dict[str, str]] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> SearchResult:
+        """Documents containing every query term, best BM25 score first"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or any(term not in self._postings for term in terms):
+            return SearchResult(hits=[], total=0, facets={"platform": {}, "hashtag": {}})
+
+        # Intersect postings, starting from the rarest term
+        postings = sorted((self._postings[term] for term in terms), key=len)
+        candidates: Iterable[str] = postings[0].keys()
+        for other in postings[1:]:
+            candidates = [doc_id for doc_id in candidates if doc_id in other]
+
+        filters = filters or {}
+        matches = [
+            doc_id for doc_id in candidates
+            if all(value in self._facets[doc_id].get(name, ()) for name, value in filters.items())
+        ]
+
+        doc_count = len(self._doc_terms)
+        average_length = self._total_length / doc_count
+        idf = {
+            term: math.log(1 + (doc_count - len(self._postings[term]) + 0.5) / (len(self._postings[term]) + 0.5))
+            for term in terms
+        }
+
+        scored = []
+        for doc_id in matches:
+            length_norm = self.K1 * (1 - self.B + self.B * self._doc_lengths[doc_id] / average_length)
+            score = 0.0
+            for term in terms:
+                frequency = self._postings[term][doc_id]
+                score += idf[term] * frequency * (self.K1 + 1) / (frequency + length_norm)
+            scored.append((doc_id, score))
+        scored.sort(key=lambda hit: (-hit[1], hit[0]))
+
+        facet_counts: Dict[str, Counter] = {"platform": Counter(), "hashtag": Counter()}
+        for doc_id in matches:
+            for name, values in self._facets[doc_id].items():
+                facet_counts.setdefault(name, Counter()).update(values)
+
+        return SearchResult(
+            hits=scored[offset:offset + limit],
+            total=len(matches),
+            facets={name: dict(counts.most_common(20)) for name, counts in facet_counts.items()},
+        )
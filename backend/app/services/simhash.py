@@ -0,0 +1,72 @@
+import hashlib
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str) -> Optional[int]:
+    """64-bit SimHash over word shingles of ``text``.
+
+    Pages that share most of their text get fingerprints that differ in
+    only a few bits. Returns None when there is too little text to tell
+    pages apart, so empty pages are never treated as duplicates.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_SIZE * 2:
+        return None
+
+    weights = [0] * FINGERPRINT_BITS
+    shingles = (" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+    for shingle in shingles:
+        value = _hash64(shingle)
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """Fingerprints seen so far, with fast lookup of near matches.
+
+    Fingerprints are split into ``max_distance + 1`` bands; two
+    fingerprints within ``max_distance`` bits must agree exactly on at
+    least one band, so only fingerprints sharing a band are compared.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        width = FINGERPRINT_BITS // bands
+        self._bands: List[Tuple[int, int]] = [
+            (i * width, width if i < bands - 1 else FINGERPRINT_BITS - i * width) for i in range(bands)
+        ]
+        self._buckets: Dict[Tuple[int, int], List[Tuple[int, str]]] = defaultdict(list)
+
+    def _keys(self, fingerprint: int) -> Iterable[Tuple[int, int]]:
+        for i, (shift, width) in enumerate(self._bands):
+            yield i, fingerprint >> shift & ((1 << width) - 1)
+
+    def find(self, fingerprint: int) -> Optional[str]:
+        """Key of a stored fingerprint within ``max_distance`` bits, if any"""
+        for band_key in self._keys(fingerprint):
+            for other, key in self._buckets.get(band_key, ()):
+                if hamming_distance(fingerprint, other) <= self.max_distance:
+                    return key
+        return None
+
+    def add(self, fingerprint: int, key: str) -> None:
+        for band_key in self._keys(fingerprint):
+            self._buckets[band_key].append((fingerprint, key))
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+from app.services import metrics
+
+T = TypeVar("T")
+
+# Receives progress events published by the in-flight call
+Listener = Callable[[Any], None]
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """One in-flight call: its task, waiter count, listeners and event history"""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.listeners: List[Listener] = []
+        self.history: List[Any] = []
+
+    def emit(self, event: Any) -> None:
+        self.history.append(event)
+        for listener in list(self.listeners):
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("single_flight.listener_failed")
+
+
+class SingleFlight(Generic[T]):
+    """Coalesces concurrent calls with the same key into one in-flight task.
+
+    The first caller for a key starts the work; callers arriving while it
+    runs wait on the same task and get the same result or exception. A
+    caller that is cancelled only stops waiting; the work itself is
+    cancelled once every waiter has gone. Finished calls are forgotten, so
+    this never serves stale results: caching is left to the caches.
+
+    The work function receives an ``emit`` callable for progress events.
+    Every waiter's listener gets all events, including the ones published
+    before it joined.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[Listener], Awaitable[T]],
+        listener: Optional[Listener] = None,
+    ) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight()
+            flight.task = asyncio.create_task(fn(flight.emit))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            metrics.SINGLE_FLIGHT_CALLS.inc(self.name, "leader")
+        else:
+            metrics.SINGLE_FLIGHT_CALLS.inc(self.name, "follower")
+
+        if listener is not None:
+            for event in flight.history:
+                listener(event)
+            flight.listeners.append(listener)
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if listener is not None:
+                flight.listeners.remove(listener)
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is waiting for the result any more
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
@@ -0,0 +1,268 @@
+"""Offline benchmarks for the campaign pipeline.
+
+    python -m benchmarks run --target scrape --requests 200 --concurrency 20
+    python -m benchmarks run --target route --llm-latency 0.5 --output after.json
+    python -m benchmarks run --target read --requests 5000 --warm-cache
+    python -m benchmarks compare before.json after.json
+
+Run from the backend directory. Results are saved as JSON under
+benchmarks/results/ unless --output is given.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.compare import compare_results
+from benchmarks.fake_llm import ProviderConfig, create_provider_app
+from benchmarks.fake_site import SiteConfig, create_site_app
+from benchmarks.harness import ServerThread, run_load
+
+TARGETS = ("scrape", "generate", "route", "read")
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def configure_environment(args: argparse.Namespace, site_url: str, provider_url: str) -> None:
+    """Point the service at the fake servers. Must run before any app module is imported."""
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    os.environ.update({
+        "ANTHROPIC_BASE_URL": provider_url,
+        "ANTHROPIC_API_KEY": "benchmark",
+        "OPENAI_BASE_URL": f"{provider_url}/v1",
+        "OPENAI_API_KEY": "benchmark",
+        "AI_FAKE_PROVIDERS": "false",
+        "CAMPAIGN_STORE": "memory",
+        "JOB_DB_PATH": os.path.join(workdir, "jobs.db"),
+        "IMAGE_STORE_PATH": os.path.join(workdir, "images"),
+        "SCRAPE_CACHE_PATH": "",
+        "LLM_CACHE_PATH": "",
+    })
+    if args.provider == "openai":
+        # AIService prefers Anthropic whenever it has a key
+        del os.environ["ANTHROPIC_API_KEY"]
+    if not args.warm_cache:
+        # Zero TTLs make every lookup stale, so each request does the full work
+        os.environ["SCRAPE_CACHE_TTL_SECONDS"] = "0"
+        os.environ["LLM_CACHE_TTL_SECONDS"] = "0"
+        os.environ["CAMPAIGN_CACHE_TTL_SECONDS"] = "0"
+        os.environ["CAMPAIGN_PAGE_CACHE_TTL_SECONDS"] = "0"
+    if args.parse_mode:
+        os.environ["SCRAPER_PARSE_MODE"] = args.parse_mode
+    if args.generation_mode:
+        os.environ["AI_GENERATION_MODE"] = args.generation_mode
+    if args.hedge:
+        os.environ["AI_HEDGING"] = "true"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def website_url(site_url: str, index: int, same_url: bool) -> str:
+    """Start URL for request ``index``; distinct per request unless ``same_url``"""
+    return f"{site_url}/" if same_url else f"{site_url}/?run={index}"
+
+
+def seed_campaigns(campaign_service, count: int, platforms: list) -> list:
+    """Save ``count`` generated-looking campaigns and return their IDs, newest first"""
+    from app.models.campaign import Campaign, CampaignContent
+
+    now = datetime.utcnow()
+    campaigns = [
+        Campaign(
+            id=f"bench-{index:05d}",
+            name=f"Product {index} - social_media Campaign",
+            campaign_type="social_media",
+            product_name=f"Product {index}",
+            target_audience="Small business owners",
+            content=[
+                CampaignContent(
+                    platform=platform,
+                    headline=f"Meet Product {index} on {platform}",
+                    body="Everything you need to run your business, in one place. " * 8,
+                    hashtags=["#Product", "#Launch", "#SmallBusiness"],
+                    call_to_action="Learn More",
+                    image_suggestions=["Product hero shot", "Team using the product"],
+                )
+                for platform in platforms
+            ],
+            website_url=f"https://example.com/{index}",
+            website_images=[{"url": f"https://example.com/{index}/hero.jpg", "alt": "Hero"}],
+            created_at=now - timedelta(minutes=index),
+        )
+        for index in range(count)
+    ]
+    campaign_service.save_campaigns(campaigns)
+    return [campaign.id for campaign in campaigns]
+
+
+async def run_target(args: argparse.Namespace, site_url: str) -> dict:
+    """Drive the chosen target and return the load summary plus service-side stage timings"""
+    platforms = args.platforms.split(",")
+
+    if args.target in ("route", "read"):
+        import httpx
+        from app.main import app
+        from app.routes.campaigns import ai_service, campaign_service, scraper_service
+
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=None
+        ) as client:
+            if args.target == "route":
+                async def call(index: int) -> None:
+                    response = await client.post("/api/campaigns/generate-from-url", json={
+                        "website_url": website_url(site_url, index, args.same_url),
+                        "platforms": platforms,
+                        "campaign_type": "social_media",
+                        "generate_images": args.images,
+                        "bypass_cache": not args.warm_cache,
+                    })
+                    response.raise_for_status()
+            else:
+                campaign_ids = seed_campaigns(campaign_service, args.campaigns, platforms)
+
+                async def call(index: int) -> None:
+                    # Alternate between the first page the frontend polls and single campaigns
+                    if index % 2:
+                        response = await client.get(f"/api/campaigns/{campaign_ids[index % len(campaign_ids)]}")
+                    else:
+                        response = await client.get("/api/campaigns/")
+                    response.raise_for_status()
+
+            result = await run_load(call, args.requests, args.concurrency, args.trace_memory)
+    else:
+        from app.services.ai_service import AIService
+        from app.services.scraper_service import ScraperService
+
+        scraper_service = ScraperService()
+        ai_service = AIService()
+
+        if args.target == "scrape":
+            async def call(index: int) -> None:
+                content = await scraper_service.scrape_website(website_url(site_url, index, args.same_url))
+                if not content.pages_crawled:
+                    raise RuntimeError("No pages crawled")
+        else:
+            website_content = await scraper_service.scrape_website(f"{site_url}/")
+
+            async def call(index: int) -> None:
+                # A distinct website URL per request keeps identical generations from being coalesced
+                content = replace(website_content, base_url=website_url(site_url, index, args.same_url))
+                await ai_service.generate_campaign_from_website(
+                    content, platforms, "social_media", use_cache=args.warm_cache
+                )
+
+        result = await run_load(call, args.requests, args.concurrency, args.trace_memory)
+
+    scraper_service.close()
+    await ai_service.aclose()
+
+    from app.services.metrics import STAGE_SECONDS
+    stages = {
+        labels[0]: {"count": count, "mean_ms": round(total / count * 1000, 2)}
+        for labels, (count, total) in sorted(STAGE_SECONDS.totals().items()) if count
+    }
+    summary = {**result.summary(), "stages": stages}
+    if ai_service.hedger is not None:
+        summary["hedging"] = ai_service.hedger.stats.as_dict()
+    return summary
+
+
+def run(args: argparse.Namespace) -> int:
+    site = SiteConfig(pages=args.pages, page_bytes=args.page_bytes, fan_out=args.fan_out, latency=args.site_latency)
+    providers = ProviderConfig(
+        llm_latency=args.llm_latency, image_latency=args.image_latency,
+        tail_latency=args.tail_latency, tail_rate=args.tail_rate,
+        rpm=args.provider_rpm, error_rate=args.provider_error_rate,
+    )
+
+    with ServerThread() as servers:
+        site_url = servers.serve(create_site_app(site))
+        provider_url = servers.serve(create_provider_app(providers))
+        configure_environment(args, site_url, provider_url)
+        summary = asyncio.run(run_target(args, site_url))
+
+    result = {
+        "name": args.name or args.target,
+        "target": args.target,
+        "started_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "config": {
+            key: getattr(args, key) for key in (
+                "requests", "concurrency", "pages", "page_bytes", "fan_out", "site_latency", "llm_latency",
+                "image_latency", "tail_latency", "tail_rate", "hedge", "provider_rpm", "provider_error_rate", "platforms", "images", "provider", "parse_mode", "generation_mode",
+                "warm_cache", "same_url", "campaigns",
+            )
+        },
+        **summary,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{args.target}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + "\n")
+
+    latency = result["latency_ms"]
+    print(
+        f"{result['name']}: {result['succeeded']}/{result['requests']} ok, {result['throughput_rps']} req/s, "
+        f"p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms, "
+        f"peak RSS {result['peak_rss_mb']} MB"
+    )
+    if "hedging" in result:
+        hedging = result["hedging"]
+        print(
+            f"hedging: {hedging['hedge_rate']:.1%} of {hedging['calls']} calls hedged, "
+            f"{hedging['secondary_wins']} won by the secondary, ~{hedging['latency_saved_seconds']} s saved"
+        )
+    print(f"Saved {output}")
+    return 1 if result["errors"] else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run a benchmark and save its results")
+    run_parser.add_argument("--target", choices=TARGETS, default="route")
+    run_parser.add_argument("--name", help="Label stored with the results")
+    run_parser.add_argument("--requests", type=int, default=50)
+    run_parser.add_argument("--concurrency", type=int, default=10)
+    run_parser.add_argument("--pages", type=int, default=50, help="Pages on the fake website")
+    run_parser.add_argument("--page-bytes", type=int, default=20_000, help="Approximate size of each page")
+    run_parser.add_argument("--fan-out", type=int, default=5, help="Links per page")
+    run_parser.add_argument("--site-latency", type=float, default=0.02, help="Seconds per page response")
+    run_parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds per LLM completion")
+    run_parser.add_argument("--image-latency", type=float, default=1.0, help="Seconds per image generation")
+    run_parser.add_argument("--tail-latency", type=float, default=0.0, help="Seconds for slow LLM completions")
+    run_parser.add_argument("--tail-rate", type=float, default=0.0, help="Fraction of LLM completions that are slow")
+    run_parser.add_argument("--hedge", action="store_true", help="Enable hedging across Anthropic and OpenAI")
+    run_parser.add_argument("--provider-rpm", type=int, default=0, help="Fake provider rate limit (429s); 0 disables")
+    run_parser.add_argument("--provider-error-rate", type=float, default=0.0, help="Fraction of provider 500s")
+    run_parser.add_argument("--platforms", default="facebook,instagram,twitter,linkedin")
+    run_parser.add_argument("--images", action="store_true", help="Generate images on the route target")
+    run_parser.add_argument("--campaigns", type=int, default=200, help="Campaigns saved for the read target")
+    run_parser.add_argument("--provider", choices=("anthropic", "openai"), default="anthropic")
+    run_parser.add_argument("--parse-mode", choices=("inline", "thread", "process"))
+    run_parser.add_argument("--generation-mode", choices=("single", "per_platform"))
+    run_parser.add_argument(
+        "--warm-cache", action="store_true", help="Keep the scrape, LLM and campaign response caches enabled"
+    )
+    run_parser.add_argument("--same-url", action="store_true", help="Send every request for the same website")
+    run_parser.add_argument("--trace-memory", action="store_true", help="Also report tracemalloc peak (slower)")
+    run_parser.add_argument("--output", help="Results file (default: benchmarks/results/<target>-<time>.json)")
+
+    compare_parser = commands.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.10, help="Relative change counted as a regression (default 0.10)"
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        return run(args)
+    return compare_results(args.baseline, args.candidate, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+import json
+from typing import List, Optional, Tuple
+
+# (label, path into the results, whether higher is better)
+COMPARED = (
+    ("throughput (req/s)", ("throughput_rps",), True),
+    ("p50 latency (ms)", ("latency_ms", "p50"), False),
+    ("p95 latency (ms)", ("latency_ms", "p95"), False),
+    ("p99 latency (ms)", ("latency_ms", "p99"), False),
+    ("peak RSS (MB)", ("peak_rss_mb",), False),
+    ("peak traced (MB)", ("peak_traced_mb",), False),
+    ("errors", ("errors",), False),
+)
+
+
+def _lookup(result: dict, path: Tuple[str, ...]) -> Optional[float]:
+    value = result
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare_results(baseline_path: str, candidate_path: str, threshold: float = 0.10) -> int:
+    """Print a side-by-side comparison; return 1 if the candidate regressed by more than ``threshold``"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(candidate_path) as f:
+        candidate = json.load(f)
+
+    if baseline.get("target") != candidate.get("target") or baseline.get("config") != candidate.get("config"):
+        print("Warning: the two runs used different targets or settings\n")
+
+    regressions: List[str] = []
+    print(f"{'metric':<20} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    for label, path, higher_is_better in COMPARED:
+        before, after = _lookup(baseline, path), _lookup(candidate, path)
+        if before is None or after is None:
+            continue
+
+        if before:
+            change = (after - before) / before
+            change_text = f"{change:+.1%}"
+        else:
+            change = 0.0 if after == before else float("inf")
+            change_text = "n/a" if after == before else "new"
+
+        worse = -change if higher_is_better else change
+        flag = ""
+        if worse > threshold:
+            flag = "  REGRESSION"
+            regressions.append(label)
+        print(f"{label:<20} {before:>12} {after:>12} {change_text:>9}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"\nNo regressions beyond {threshold:.0%}")
+    return 0
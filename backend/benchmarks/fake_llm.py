@@ -0,0 +1,171 @@
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from aiohttp import web
+
+from app.services.fake_provider import FakeProviderStats, fake_campaign_json, fake_chunks, fake_latency
+
+STATS = web.AppKey("stats", dict)
+
+
+@dataclass
+class ProviderConfig:
+    """Simulated provider latencies (seconds) and faults"""
+    llm_latency: float = 1.0
+    image_latency: float = 2.0
+    tail_latency: float = 0.0  # LLM latency for the slow tail_rate fraction of completions
+    tail_rate: float = 0.0
+    rpm: int = 0  # requests per minute before answering 429 with Retry-After; 0 disables
+    error_rate: float = 0.0  # fraction of requests answered with a 500
+
+
+async def _stream_events(
+    request: web.Request, events: List[Tuple[Optional[str], str]], latency: float, stats: FakeProviderStats
+) -> web.StreamResponse:
+    """Send ``(event name, data)`` pairs as Server-Sent Events spread evenly over ``latency``"""
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+    await response.prepare(request)
+    delay = latency / len(events)
+    with stats:
+        for event, data in events:
+            await asyncio.sleep(delay)
+            prefix = f"event: {event}\n" if event else ""
+            await response.write(f"{prefix}data: {data}\n\n".encode("utf-8"))
+    await response.write_eof()
+    return response
+
+
+def _error(status: int, message: str, headers: dict = None) -> web.Response:
+    return web.json_response(
+        {"type": "error", "error": {"type": "api_error", "message": message}}, status=status, headers=headers
+    )
+
+
+def create_provider_app(config: ProviderConfig) -> web.Application:
+    """aiohttp app speaking the Anthropic Messages, OpenAI Chat Completions and Images APIs.
+
+    Point ANTHROPIC_BASE_URL at the server root and OPENAI_BASE_URL at
+    ``/v1`` so the real SDK clients (and their HTTP pooling) are exercised.
+    Call counters are kept in ``app[STATS]``.
+    """
+    stats = {"anthropic": FakeProviderStats(), "openai": FakeProviderStats(), "images": FakeProviderStats()}
+    recent: deque = deque()  # request times within the last minute
+    rng = random.Random(0)
+
+    @web.middleware
+    async def faults(request: web.Request, handler) -> web.StreamResponse:
+        now = time.monotonic()
+        if config.rpm:
+            while recent and now - recent[0] >= 60:
+                recent.popleft()
+            if len(recent) >= config.rpm:
+                wait = math.ceil(60 - (now - recent[0]))
+                return _error(429, "Rate limit exceeded", headers={"Retry-After": str(wait)})
+            recent.append(now)
+        if config.error_rate and rng.random() < config.error_rate:
+            return _error(500, "Internal server error")
+        return await handler(request)
+
+    def llm_latency() -> float:
+        return fake_latency(config.llm_latency, config.tail_latency, config.tail_rate)
+
+    async def messages(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        text = f"```json\n{fake_campaign_json(prompt)}\n```"
+        message = {
+            "id": f"msg_{uuid.uuid4().hex}",
+            "type": "message",
+            "role": "assistant",
+            "model": body["model"],
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4},
+        }
+        if body.get("stream"):
+            start = {**message, "content": [], "stop_reason": None, "usage": {**message["usage"], "output_tokens": 0}}
+            events = [
+                ("message_start", {"type": "message_start", "message": start}),
+                ("content_block_start", {
+                    "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""},
+                }),
+            ]
+            events += [
+                ("content_block_delta", {
+                    "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk},
+                })
+                for chunk in fake_chunks(text)
+            ]
+            events += [
+                ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+                ("message_delta", {
+                    "type": "message_delta",
+                    "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                    "usage": {"output_tokens": len(text) // 4},
+                }),
+                ("message_stop", {"type": "message_stop"}),
+            ]
+            events = [(name, json.dumps(data)) for name, data in events]
+            return await _stream_events(request, events, llm_latency(), stats["anthropic"])
+
+        with stats["anthropic"]:
+            await asyncio.sleep(llm_latency())
+        return web.json_response(message)
+
+    async def chat_completions(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        text = fake_campaign_json(prompt)
+        completion = {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "created": int(time.time()),
+            "model": body["model"],
+        }
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(text) // 4,
+            "total_tokens": (len(prompt) + len(text)) // 4,
+        }
+        if body.get("stream"):
+            chunk = {**completion, "object": "chat.completion.chunk"}
+            events = [
+                {**chunk, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                for piece in fake_chunks(text)
+            ]
+            events.append({**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            if body.get("stream_options", {}).get("include_usage"):
+                events.append({**chunk, "choices": [], "usage": usage})
+            events = [(None, json.dumps(event)) for event in events] + [(None, "[DONE]")]
+            return await _stream_events(request, events, llm_latency(), stats["openai"])
+
+        with stats["openai"]:
+            await asyncio.sleep(llm_latency())
+        return web.json_response({
+            **completion,
+            "object": "chat.completion",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    async def images(request: web.Request) -> web.Response:
+        with stats["images"]:
+            await asyncio.sleep(config.image_latency)
+        return web.json_response({
+            "created": int(time.time()),
+            "data": [{"url": f"https://images.invalid/{uuid.uuid4().hex}.png"}],
+        })
+
+    app = web.Application(middlewares=[faults])
+    app[STATS] = stats
+    app.router.add_post("/v1/messages", messages)
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_post("/v1/images/generations", images)
+    return app
@@ -0,0 +1,101 @@
+import asyncio
+import random
+from dataclasses import dataclass
+from io import BytesIO
+
+from aiohttp import web
+from PIL import Image, ImageDraw
+
+WORDS = (
+    "fast secure cloud storage team sync files backup encryption pricing plan enterprise collaborate share "
+    "mobile desktop analytics dashboard workflow automation integration api reports insights customers "
+    "support onboarding templates security compliance performance scale reliable simple powerful modern"
+).split()
+
+
+@dataclass
+class SiteConfig:
+    """Shape of the synthetic website"""
+    pages: int = 50
+    page_bytes: int = 20_000
+    fan_out: int = 5
+    latency: float = 0.02
+
+
+def render_page(number: int, config: SiteConfig) -> bytes:
+    """Deterministic HTML for one page, padded with paragraphs to about ``page_bytes``"""
+    rng = random.Random(number)
+    links = "".join(
+        f'<a href="/page/{(number * config.fan_out + i) % config.pages}">{rng.choice(WORDS).title()} {i}</a>'
+        for i in range(1, config.fan_out + 1)
+    )
+    head = (
+        f"<html><head><title>Bench Site | Page {number}</title>"
+        f'<meta name="description" content="Synthetic page {number} for benchmarks"></head><body>'
+        f"<h1>{' '.join(rng.choices(WORDS, k=4)).title()}</h1><h2>{' '.join(rng.choices(WORDS, k=3)).title()}</h2>"
+        f'<img src="/images/hero-{number}.jpg" alt="Hero {number}">{links}'
+    )
+    paragraphs = []
+    size = len(head)
+    while size < config.page_bytes:
+        sentences = (" ".join(rng.choices(WORDS, k=14)).capitalize() + "." for _ in range(4))
+        paragraph = f"<p>{' '.join(sentences)}</p>"
+        paragraphs.append(paragraph)
+        size += len(paragraph)
+    return (head + "".join(paragraphs) + "</body></html>").encode()
+
+
+def render_image(number: int) -> bytes:
+    """Deterministic JPEG for page ``number``.
+
+    There are only a few distinct designs, each served at two sizes, so
+    the image stage has near-duplicates to remove; every sixth image is a
+    16px spacer.
+    """
+    design = number % 6
+    if design == 5:
+        size = (16, 16)
+    else:
+        size = (1200, 800) if number % 2 else (600, 400)
+    image = Image.new("RGB", (120, 80), (40 * design, 90, 200 - 30 * design))
+    draw = ImageDraw.Draw(image)
+    rng = random.Random(design)
+    for _ in range(6):
+        x, y = rng.randrange(100), rng.randrange(60)
+        draw.ellipse((x, y, x + 20, y + 20), fill=tuple(rng.randrange(256) for _ in range(3)))
+    output = BytesIO()
+    image.resize(size).save(output, "JPEG", quality=85)
+    return output.getvalue()
+
+
+def create_site_app(config: SiteConfig) -> web.Application:
+    """aiohttp app serving ``config.pages`` linked pages at / and /page/{n}, with an image per page"""
+    cache = {}
+
+    async def page(request: web.Request) -> web.Response:
+        await asyncio.sleep(config.latency)
+        number = int(request.match_info.get("number", 0)) % config.pages
+        if number not in cache:
+            cache[number] = render_page(number, config)
+        return web.Response(body=cache[number], content_type="text/html", charset="utf-8")
+
+    async def image(request: web.Request) -> web.Response:
+        await asyncio.sleep(config.latency)
+        key = ("image", int(request.match_info["number"]))
+        if key not in cache:
+            cache[key] = render_image(key[1])
+        return web.Response(body=cache[key], content_type="image/jpeg")
+
+    async def robots(request: web.Request) -> web.Response:
+        return web.Response(text="User-agent: *\nDisallow:\n")
+
+    async def not_found(request: web.Request) -> web.Response:
+        raise web.HTTPNotFound()
+
+    app = web.Application()
+    app.router.add_get("/", page)
+    app.router.add_get("/page/{number:\\d+}", page)
+    app.router.add_get("/images/hero-{number:\\d+}.jpg", image)
+    app.router.add_get("/robots.txt", robots)
+    app.router.add_get("/sitemap.xml", not_found)
+    return app
@@ -0,0 +1,136 @@
+import asyncio
+import math
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional
+
+from aiohttp import web
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class ServerThread:
+    """Serves aiohttp apps on 127.0.0.1 from a background event loop.
+
+    Keeping the fake servers off the benchmark's event loop stops their
+    work from being counted as service latency.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="bench-servers", daemon=True)
+        self._runners: List[web.AppRunner] = []
+
+    def __enter__(self) -> "ServerThread":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for runner in self._runners:
+            asyncio.run_coroutine_threadsafe(runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def serve(self, app: web.Application) -> str:
+        """Start serving ``app`` on a free port and return its base URL"""
+        async def start() -> str:
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            await web.TCPSite(runner, "127.0.0.1", 0).start()
+            self._runners.append(runner)
+            host, port = runner.addresses[0][:2]
+            return f"http://{host}:{port}"
+
+        return asyncio.run_coroutine_threadsafe(start(), self._loop).result()
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linearly interpolated percentile of ``values`` (q in 0..100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, if the platform reports it"""
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+@dataclass
+class LoadResult:
+    """Outcome of one load run"""
+    requests: int
+    concurrency: int
+    duration: float
+    latencies: List[float] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    peak_traced_mb: Optional[float] = None
+
+    def summary(self) -> dict:
+        latencies_ms = [latency * 1000 for latency in self.latencies]
+        return {
+            "requests": self.requests,
+            "concurrency": self.concurrency,
+            "succeeded": len(self.latencies),
+            "errors": len(self.errors),
+            "error_samples": self.errors[:5],
+            "duration_seconds": round(self.duration, 3),
+            "throughput_rps": round(len(self.latencies) / self.duration, 3) if self.duration else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(latencies_ms, 50), 2),
+                "p95": round(percentile(latencies_ms, 95), 2),
+                "p99": round(percentile(latencies_ms, 99), 2),
+                "mean": round(sum(latencies_ms) / len(latencies_ms), 2) if latencies_ms else 0.0,
+                "max": round(max(latencies_ms), 2) if latencies_ms else 0.0,
+            },
+            "peak_rss_mb": peak_rss_mb(),
+            "peak_traced_mb": self.peak_traced_mb,
+        }
+
+
+async def run_load(
+    call: Callable[[int], Awaitable[object]],
+    requests: int,
+    concurrency: int,
+    trace_memory: bool = False,
+) -> LoadResult:
+    """Run ``call(i)`` for i in range(requests) with at most ``concurrency`` in flight.
+
+    Each call is timed individually; exceptions count as errors and are
+    excluded from the latency distribution.
+    """
+    result = LoadResult(requests=requests, concurrency=concurrency, duration=0.0)
+    indices = iter(range(requests))
+
+    async def worker() -> None:
+        for index in indices:
+            started = time.perf_counter()
+            try:
+                await call(index)
+            except Exception as e:
+                result.errors.append(f"{type(e).__name__}: {e}")
+            else:
+                result.latencies.append(time.perf_counter() - started)
+
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    finally:
+        result.duration = time.perf_counter() - started
+        if trace_memory:
+            result.peak_traced_mb = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+            tracemalloc.stop()
+    return result
@@ -1,18 +1,31 @@
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
+import { useInfiniteQuery, useMutation, useQueryClient, type InfiniteData } from '@tanstack/react-query'
 import { campaignApi } from '../services/api'
+import type { CampaignPage } from '../types/campaign'
 
 export default function CampaignsPage() {
   const queryClient = useQueryClient()
 
-  const { data: campaigns, isLoading } = useQuery({
+  const { data, isLoading, hasNextPage, fetchNextPage, isFetchingNextPage } = useInfiniteQuery({
     queryKey: ['campaigns'],
-    queryFn: campaignApi.list,
+    queryFn: ({ pageParam }) => campaignApi.list(pageParam),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
   })
+  const campaigns = data?.pages.flatMap((page) => page.items)
 
   const deleteMutation = useMutation({
     mutationFn: campaignApi.delete,
-    onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ['campaigns'] })
+    onSuccess: (_, deletedId) => {
+      // Drop the campaign from the loaded pages instead of refetching them all
+      queryClient.setQueryData<InfiniteData<CampaignPage>>(['campaigns'], (old) =>
+        old && {
+          ...old,
+          pages: old.pages.map((page) => ({
+            ...page,
+            items: page.items.filter((campaign) => campaign.id !== deletedId),
+          })),
+        }
+      )
     },
   })
 
@@ -66,6 +79,16 @@ export default function CampaignsPage() {
           </div>
         ))}
       </div>
+
+      {hasNextPage && (
+        <button
+          onClick={() => fetchNextPage()}
+          disabled={isFetchingNextPage}
+          className="mt-6 w-full py-2 px-4 bg-gray-100 hover:bg-gray-200 rounded-lg font-medium transition disabled:opacity-50"
+        >
+          {isFetchingNextPage ? 'Loading...' : 'Load more'}
+        </button>
+      )}
     </div>
   )
 }
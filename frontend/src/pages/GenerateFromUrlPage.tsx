@@ -21,6 +21,7 @@ const CAMPAIGN_TYPES = [
 
 export default function GenerateFromUrlPage() {
   const [generatedCampaign, setGeneratedCampaign] = useState<Campaign | null>(null)
+  const [progress, setProgress] = useState('Analyzing website & generating campaign...')
   const [urlFormData, setUrlFormData] = useState<CampaignFromURL>({
     website_url: '',
     campaign_type: 'social_media',
@@ -28,8 +29,18 @@ export default function GenerateFromUrlPage() {
     generate_images: false,
   })
 
+  const handleProgress = (event: string, payload: any) => {
+    if (event === 'page') setProgress(`Crawled ${payload.title || payload.url}`)
+    else if (event === 'website') setProgress(`Analyzed ${payload.pages_crawled} pages, writing campaign copy...`)
+    else if (event === 'content') setProgress(`Wrote ${payload.platform} post...`)
+    else if (event === 'image') setProgress(`Generated ${payload.platform} image...`)
+  }
+
   const urlMutation = useMutation({
-    mutationFn: campaignApi.generateFromUrl,
+    mutationFn: (data: CampaignFromURL) => {
+      setProgress('Analyzing website & generating campaign...')
+      return campaignApi.generateFromUrlStream(data, handleProgress)
+    },
     onSuccess: (data) => setGeneratedCampaign(data),
   })
 
@@ -137,7 +148,7 @@ export default function GenerateFromUrlPage() {
                 <circle className="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" strokeWidth="4" fill="none"/>
                 <path className="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8V0C5.373 0 0 5.373 0 12h4zm2 5.291A7.962 7.962 0 014 12H0c0 3.042 1.135 5.824 3 7.938l3-2.647z"/>
               </svg>
-              Analyzing website & generating campaign...
+              {progress}
             </span>
           ) : (
             <span className="flex items-center justify-center gap-2">
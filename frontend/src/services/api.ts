@@ -1,5 +1,5 @@
 import axios from 'axios'
-import type { Campaign, CampaignGenerate, CampaignFromURL } from '../types/campaign'
+import type { Campaign, CampaignGenerate, CampaignFromURL, CampaignPage } from '../types/campaign'
 
 const api = axios.create({
   baseURL: '/api',
@@ -17,8 +17,46 @@ export const campaignApi = {
     return response.data
   },
 
-  list: async (): Promise<Campaign[]> => {
-    const response = await api.get('/campaigns/')
+  generateFromUrlStream: async (
+    data: CampaignFromURL,
+    onEvent: (event: string, payload: any) => void,
+  ): Promise<Campaign> => {
+    // POST + Server-Sent Events, so read the stream with fetch rather than EventSource
+    const response = await fetch('/api/campaigns/generate-from-url/stream', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(data),
+    })
+    if (!response.ok || !response.body) {
+      throw new Error(`Request failed with status ${response.status}`)
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+    let buffer = ''
+    let campaign: Campaign | null = null
+    while (true) {
+      const { value, done } = await reader.read()
+      if (done) break
+      buffer += value
+
+      let boundary
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const message = buffer.slice(0, boundary)
+        buffer = buffer.slice(boundary + 2)
+        const event = message.match(/^event: (.*)$/m)?.[1] ?? 'message'
+        const payload = JSON.parse(message.match(/^data: (.*)$/m)?.[1] ?? 'null')
+        if (event === 'error') throw new Error(payload.detail)
+        if (event === 'campaign') campaign = payload
+        onEvent(event, payload)
+      }
+    }
+
+    if (!campaign) throw new Error('Stream ended before the campaign was generated')
+    return campaign
+  },
+
+  list: async (cursor?: string, limit = 20): Promise<CampaignPage> => {
+    const response = await api.get('/campaigns/', { params: { cursor, limit } })
     return response.data
   },
 
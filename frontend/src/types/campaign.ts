@@ -18,6 +18,7 @@ export interface CampaignFromURL {
   campaign_type: CampaignType
   platforms: Platform[]
   generate_images?: boolean
+  bypass_cache?: boolean
 }
 
 export interface CampaignContent {
@@ -38,7 +39,12 @@ export interface Campaign {
   target_audience: string
   content: CampaignContent[]
   website_url?: string
-  website_images?: { url: string; alt: string }[]
+  website_images?: { url: string; alt: string; source_url?: string; width?: number; height?: number }[]
   created_at: string
   updated_at?: string
 }
+
+export interface CampaignPage {
+  items: Campaign[]
+  next_cursor: string | null
+}